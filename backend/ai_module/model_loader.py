@@ -3,8 +3,15 @@ AI模型加载和推理模块
 """
 
 import torch
+import torch.nn as nn
+import torch.nn.functional as F
 import pickle
 import json
+import threading
+import warnings
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import numpy as np
 from pathlib import Path
 import logging
@@ -13,17 +20,37 @@ from ..config import AI_MODEL_CONFIG, THREAT_THRESHOLDS
 
 logger = logging.getLogger(__name__)
 
+# 响应级别阶梯：置信度严格大于第i个阈值即进入第i+1级
+_RESPONSE_THRESHOLDS = (
+    THREAT_THRESHOLDS['medium_low'],
+    THREAT_THRESHOLDS['medium_high'],
+    THREAT_THRESHOLDS['high_confidence'],
+)
+_RESPONSE_LEVELS = (
+    "silent_logging",
+    "manual_decision_alert",
+    "auto_create_proposal",
+    "automatic_response",
+)
+
 class ThreatDetectionModel:
     """威胁检测模型管理器"""
     
     def __init__(self):
         self.model = None
+        self.inference_model = None
         self.scaler = None
         self.feature_selector = None
         self.label_encoder = None
         self.model_info = None
         self.selected_features = None
         self.inference_data = None
+        self.true_labels = None
+        self.attack_indices = None
+        self._rng = np.random.default_rng()  # 独立生成器，不经过numpy全局RandomState
+        self._prediction_cache = None
+        self._sample_features = None
+        self._prediction_cache_lock = threading.Lock()
         self._load_all_components()
     
     def _load_all_components(self):
@@ -31,17 +58,23 @@ class ThreatDetectionModel:
         try:
             logger.info("🤖 开始加载AI模型组件...")
             
-            # 加载预处理组件先（需要用于模型验证）
-            self._load_preprocessors()
-            
-            # 加载模型信息和特征
-            self._load_metadata()
+            # 预处理组件、模型信息、PyTorch模型和推理数据互不依赖，
+            # 并发加载以重叠文件读取；任一组件失败时result()重新抛出异常
+            loaders = (
+                self._load_preprocessors,
+                self._load_metadata,
+                self._load_pytorch_model,
+                self._load_inference_data,
+            )
+            with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+                for future in [executor.submit(loader) for loader in loaders]:
+                    future.result()
             
-            # 加载PyTorch模型（最后加载，因为需要验证）
-            self._load_pytorch_model()
+            # 编译推理模型（需要推理数据确定输入形状）
+            self._compile_inference_model()
             
-            # 加载推理数据
-            self._load_inference_data()
+            # 启动时一次性推理全部样本，避免首个模拟请求承担整批推理
+            self._get_prediction_cache()
             
             logger.info("✅ AI模型组件加载完成")
             
@@ -92,9 +125,6 @@ class ThreatDetectionModel:
     
     def _create_ensemble_hybrid_model(self, input_dim: int, num_classes: int):
         """创建真实的Ensemble_Hybrid模型架构（完全匹配training.ipynb）"""
-        import torch.nn as nn
-        import torch.nn.functional as F
-        
         class ResidualBlock(nn.Module):
             """残差块 - 改善梯度流动"""
             def __init__(self, dim, dropout_rate=0.2):
@@ -240,17 +270,15 @@ class ThreatDetectionModel:
                         nn.init.constant_(module.bias, 0)
             
             def forward(self, x, return_intermediate=False):
-                if torch.isnan(x).any() or torch.isinf(x).any():
-                    x = torch.nan_to_num(x, nan=0.0, posinf=1.0, neginf=-1.0)
+                # nan_to_num对有限值是恒等变换，无条件调用使计算图不依赖数据分支（便于TorchScript追踪）
+                x = torch.nan_to_num(x, nan=0.0, posinf=1.0, neginf=-1.0)
                 
                 outputs = [
                     self.deep_branch(x), self.wide_branch(x), self.res_branch(x),
                     self.attention_branch(x), self.interaction_branch(x)
                 ]
                 
-                for i, out in enumerate(outputs):
-                    if torch.isnan(out).any() or torch.isinf(out).any():
-                        outputs[i] = torch.nan_to_num(out, nan=0.0, posinf=1.0, neginf=-1.0)
+                outputs = [torch.nan_to_num(out, nan=0.0, posinf=1.0, neginf=-1.0) for out in outputs]
                 
                 deep_out, wide_out, res_out, att_out, inter_out = outputs
                 
@@ -268,8 +296,7 @@ class ThreatDetectionModel:
                 
                 ensemble_output = 0.7 * final_output + 0.3 * weighted_output
                 
-                if torch.isnan(ensemble_output).any() or torch.isinf(ensemble_output).any():
-                    ensemble_output = torch.nan_to_num(ensemble_output, nan=0.0, posinf=1.0, neginf=-1.0)
+                ensemble_output = torch.nan_to_num(ensemble_output, nan=0.0, posinf=1.0, neginf=-1.0)
                     
                 if return_intermediate:
                     return {
@@ -281,13 +308,65 @@ class ThreatDetectionModel:
         
         return Ensemble_Hybrid(input_dim, num_classes)
     
+    def _compile_inference_model(self):
+        """按配置编译推理模型（TorchScript或torch.compile），失败时回退到原始模型"""
+        model = self.model
+        if AI_MODEL_CONFIG['quantize_int8']:
+            model = self._quantize_int8(model)
+        
+        self.inference_model = model
+        backend = AI_MODEL_CONFIG['compile_backend']
+        if backend == "none":
+            return
+        
+        try:
+            # 使用批大小=2的真实样本（与权重验证一致，避免BatchNorm问题）
+            example_input = torch.as_tensor(self.inference_data[:2], dtype=torch.float32)
+            with torch.no_grad(), warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)  # torch.jit弃用提示
+                if backend == "torch_compile":
+                    # 批大小随请求变化，使用动态形状避免重复编译
+                    compiled = torch.compile(model, dynamic=True)
+                else:
+                    compiled = torch.jit.freeze(torch.jit.trace(model, example_input))
+            
+            # 预热（与推理路径相同的推理上下文），避免首个请求承担编译/优化开销
+            with self._inference_context():
+                for _ in range(AI_MODEL_CONFIG['compile_warmup_runs']):
+                    compiled(example_input)
+                    compiled(example_input[:1])
+            
+            self.inference_model = compiled
+            logger.info(f"✅ 推理模型编译完成: {backend}")
+            
+        except Exception as e:
+            logger.warning(f"⚠️ 推理模型编译失败（{backend}），使用原始模型推理: {e}")
+    
+    @contextmanager
+    def _inference_context(self):
+        """推理上下文：inference_mode + TorchScript执行器优化开关（线程局部设置，对eager模型无影响）"""
+        with torch.inference_mode(), torch.jit.optimized_execution(AI_MODEL_CONFIG['jit_optimized_execution']):
+            yield
+    
+    def _quantize_int8(self, model):
+        """对Linear层做int8动态量化（返回量化副本，原FP32模型保留用于验证），失败时返回原模型"""
+        try:
+            quantized = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            logger.info("✅ 推理模型int8动态量化完成")
+            return quantized
+        except Exception as e:
+            logger.warning(f"⚠️ int8动态量化失败，使用FP32模型推理: {e}")
+            return model
+    
     def _verify_model_weights(self):
         """验证模型权重是否正确加载"""
         try:
             # 创建一个测试输入（使用批大小=2来防止BatchNorm问题）
             test_input = torch.randn(2, 64)  # 模拟64个特征的输入，批大小=2
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 # 执行前向传播
                 output = self.model(test_input)
                 
@@ -332,7 +411,6 @@ class ThreatDetectionModel:
         """加载真实的预处理器"""
         # 根据Context7文档，使用joblib是scikit-learn推荐的序列化方法
         import joblib
-        import warnings
         from sklearn.exceptions import InconsistentVersionWarning
         
         # 设置warning过滤器以便处理版本不匹配
@@ -401,14 +479,31 @@ class ThreatDetectionModel:
         # 加载选择的特征
         features_path = AI_MODEL_CONFIG['selected_features_file']
         with open(features_path, 'r') as f:
-            self.selected_features = json.load(f)
+            # 特征列表加载后不再变化，冻结为元组供各调用共享
+            self.selected_features = tuple(json.load(f))
         logger.info(f"✅ 特征信息加载成功: {len(self.selected_features)}个特征")
     
     def _load_inference_data(self):
         """加载推理测试数据"""
         try:
             data_path = AI_MODEL_CONFIG['inference_data_file']
-            self.inference_data = torch.load(data_path, map_location='cpu')
+            try:
+                # 内存映射只读加载：多个worker进程共享同一份物理页，不在各自堆上复制
+                data = torch.load(data_path, map_location='cpu', mmap=True, weights_only=True)
+            except (pickle.UnpicklingError, RuntimeError) as e:
+                # 旧版非zip格式不支持mmap，含numpy数组等非张量对象时weights_only拒绝加载
+                logger.warning(f"⚠️ 推理数据无法以内存映射方式加载，改为普通加载: {str(e).splitlines()[0]}")
+                data = torch.load(data_path, map_location='cpu', weights_only=False)
+            
+            # 已是连续float32张量时以下转换不拷贝，之后按样本取numpy视图也无需再拷贝
+            if not (isinstance(data, torch.Tensor) and data.dtype == torch.float32):
+                logger.warning(f"⚠️ 推理数据类型为{getattr(data, 'dtype', type(data).__name__)}，"
+                               f"转换为float32会复制一份数据")
+            self.inference_data = torch.as_tensor(data, dtype=torch.float32).contiguous()
+            
+            # 预先计算标签数组和攻击样本索引，避免每次抽样重建
+            self.true_labels = np.array(self._get_true_labels())
+            self.attack_indices = np.flatnonzero(self.true_labels != 'Benign')
             logger.info(f"✅ 推理数据加载成功: {len(self.inference_data)}个真实样本")
                 
         except Exception as e:
@@ -427,32 +522,26 @@ class ThreatDetectionModel:
             labels.extend([class_name] * 10)
         
         # 使用固定种子应用shuffle（与抽样脚本一致）
-        # 注意：这里需要保存随机状态，避免每次调用都重置随机种子
-        random_state = np.random.get_state()
-        np.random.seed(42)
-        shuffled_indices = np.random.permutation(len(labels))
+        # 注意：使用局部RandomState而不是全局随机状态，并发加载的其他线程不受影响
+        shuffled_indices = np.random.RandomState(42).permutation(len(labels))
         shuffled_labels = [labels[i] for i in shuffled_indices]
-        np.random.set_state(random_state)  # 恢复随机状态
         
         return shuffled_labels
     
-    def get_random_attack_sample(self) -> Tuple[np.ndarray, str]:
-        """随机获取一个攻击样本"""
+    def _random_attack_index(self) -> int:
+        """随机选择一个攻击样本的索引"""
         if self.inference_data is None:
             raise RuntimeError("推理数据未加载")
         
-        # 获取真实标签映射
-        true_labels = self._get_true_labels()
-        
-        # 找到所有攻击样本的索引
-        attack_indices = [i for i, label in enumerate(true_labels) if label != 'Benign']
-        
-        if not attack_indices:
+        if len(self.attack_indices) == 0:
             raise RuntimeError("没有找到攻击样本")
         
-        # 随机选择一个攻击样本
-        sample_idx = np.random.choice(attack_indices)
-        true_label = true_labels[sample_idx]
+        return int(self.attack_indices[self._rng.integers(len(self.attack_indices))])
+    
+    def get_random_attack_sample(self) -> Tuple[np.ndarray, str]:
+        """随机获取一个攻击样本"""
+        sample_idx = self._random_attack_index()
+        true_label = str(self.true_labels[sample_idx])
         
         # 提取特征（直接使用真实的inference_data.pt tensor）
         features = self.inference_data[sample_idx].numpy()
@@ -476,40 +565,55 @@ class ThreatDetectionModel:
                 logger.debug("对原始数据进行预处理")
             
             # 模型推理
-            with torch.no_grad():
+            with self._inference_context():
                 input_tensor = torch.FloatTensor(processed_features).unsqueeze(0)
-                outputs = self.model(input_tensor)
+                outputs = self.inference_model(input_tensor)
                 probabilities = torch.softmax(outputs, dim=1)
-                
-                # 应用改进的决策策略
-                predicted_class_idx, confidence, predicted_class = self._apply_improved_decision_strategy(probabilities[0], strategy)
-                
-                # 记录原始最高概率预测供对比
-                original_predicted_idx = torch.argmax(probabilities, dim=1).item()
-                original_predicted_class = self.label_encoder.inverse_transform([original_predicted_idx])[0]
-                
-                if predicted_class != original_predicted_class:
-                    logger.info(f"决策策略调整: 原始预测={original_predicted_class}, 调整后={predicted_class}")
-                
-                # 调试信息：记录所有类别概率
-                logger.debug(f"预测结果: {predicted_class} (索引: {predicted_class_idx}, 置信度: {confidence:.4f})")
-                logger.debug(f"所有类别概率: {dict(zip(self.model_info['classes'], probabilities[0].tolist()))}")
-                
-                # 确定响应级别
-                response_level = self._determine_response_level(confidence)
-                
-                return {
-                    "predicted_class": predicted_class,
-                    "confidence": confidence,
-                    "response_level": response_level,
-                    "all_probabilities": probabilities[0].tolist(),
-                    "class_names": self.model_info['classes']
-                }
+                return self._build_prediction(probabilities[0], strategy)
                 
         except Exception as e:
             logger.error(f"❌ 威胁预测失败: {e}")
             raise
     
+    def predict_threat_batch(self, features_batch: np.ndarray, strategy: str = "original") -> List[Dict]:
+        """对一批已预处理样本执行威胁预测（一次前向传播）"""
+        try:
+            with self._inference_context():
+                outputs = self.inference_model(torch.FloatTensor(features_batch))
+                probabilities = torch.softmax(outputs, dim=1)
+                return [self._build_prediction(row, strategy) for row in probabilities]
+                
+        except Exception as e:
+            logger.error(f"❌ 批量威胁预测失败: {e}")
+            raise
+    
+    def _build_prediction(self, probabilities: torch.Tensor, strategy: str = "original") -> Dict:
+        """根据单个样本的类别概率构造预测结果"""
+        # 应用改进的决策策略
+        predicted_class_idx, confidence, predicted_class = self._apply_improved_decision_strategy(probabilities, strategy)
+        
+        # 记录原始最高概率预测供对比
+        original_predicted_idx = torch.argmax(probabilities).item()
+        original_predicted_class = self.label_encoder.inverse_transform([original_predicted_idx])[0]
+        
+        if predicted_class != original_predicted_class:
+            logger.info(f"决策策略调整: 原始预测={original_predicted_class}, 调整后={predicted_class}")
+        
+        # 调试信息：记录所有类别概率
+        logger.debug(f"预测结果: {predicted_class} (索引: {predicted_class_idx}, 置信度: {confidence:.4f})")
+        logger.debug(f"所有类别概率: {dict(zip(self.model_info['classes'], probabilities.tolist()))}")
+        
+        # 确定响应级别
+        response_level = self._determine_response_level(confidence)
+        
+        return {
+            "predicted_class": predicted_class,
+            "confidence": confidence,
+            "response_level": response_level,
+            "all_probabilities": probabilities.tolist(),
+            "class_names": self.model_info['classes']
+        }
+    
     def _preprocess_features(self, features: np.ndarray) -> np.ndarray:
         """预处理特征数据 - 修复维度不匹配问题"""
         # 确保输入是2D数组
@@ -613,27 +717,41 @@ class ThreatDetectionModel:
     
     def _determine_response_level(self, confidence: float) -> str:
         """根据置信度确定响应级别"""
-        if confidence > THREAT_THRESHOLDS['high_confidence']:
-            return "automatic_response"
-        elif confidence > THREAT_THRESHOLDS['medium_high']:
-            return "auto_create_proposal"
-        elif confidence > THREAT_THRESHOLDS['medium_low']:
-            return "manual_decision_alert"
-        else:
-            return "silent_logging"
+        return _RESPONSE_LEVELS[bisect_left(_RESPONSE_THRESHOLDS, confidence)]
+    
+    def _get_prediction_cache(self) -> List[Dict]:
+        """获取全部推理样本的预测结果缓存
+        
+        模型处于评估模式，同一样本的预测结果固定；加载组件时分块批量推理全部样本，
+        之后只读返回（加锁构建，并发调用不会重复推理）
+        """
+        if self._prediction_cache is None:
+            with self._prediction_cache_lock:
+                if self._prediction_cache is None:
+                    features = self.inference_data.numpy()
+                    chunk_size = AI_MODEL_CONFIG['prediction_chunk_size']
+                    cache = []
+                    for start in range(0, len(features), chunk_size):
+                        cache.extend(self.predict_threat_batch(features[start:start + chunk_size]))
+                    # 样本特征列表同样只转换一次（每次调用仅做浅拷贝）
+                    self._sample_features = self.inference_data.tolist()
+                    self._prediction_cache = cache
+                    logger.info(f"✅ 推理结果缓存完成: {len(cache)}个样本")
+        return self._prediction_cache
+    
+    def _cached_detection(self, sample_idx: int) -> Dict:
+        """根据样本索引构造检测结果（预测部分来自缓存）"""
+        prediction_result = dict(self._get_prediction_cache()[sample_idx])
+        prediction_result['true_label'] = str(self.true_labels[sample_idx])
+        prediction_result['sample_features'] = list(self._sample_features[sample_idx])
+        return prediction_result
     
     def simulate_attack_detection(self) -> Dict:
         """模拟攻击检测完整流程"""
         try:
-            # 获取随机攻击样本
-            features, true_label = self.get_random_attack_sample()
-            
-            # 执行预测（inference_data中的数据已预处理）
-            prediction_result = self.predict_threat(features, is_preprocessed=True)
-            
-            # 添加真实标签信息
-            prediction_result['true_label'] = true_label
-            prediction_result['sample_features'] = features.tolist()
+            # 随机选择攻击样本，预测结果直接查缓存（inference_data中的数据已预处理）
+            prediction_result = self._cached_detection(self._random_attack_index())
+            true_label = prediction_result['true_label']
             
             logger.info(f"🎯 模拟攻击检测完成:")
             logger.info(f"   真实标签: {true_label}")
@@ -647,6 +765,21 @@ class ThreatDetectionModel:
             logger.error(f"❌ 模拟攻击检测失败: {e}")
             raise
     
+    def simulate_attack_detections(self, count: int) -> List[Dict]:
+        """批量模拟攻击检测（预测结果来自缓存）"""
+        try:
+            prediction_results = [
+                self._cached_detection(self._random_attack_index()) for _ in range(count)
+            ]
+            
+            logger.info(f"🎯 批量模拟攻击检测完成: {count}个样本")
+            
+            return prediction_results
+            
+        except Exception as e:
+            logger.error(f"❌ 批量模拟攻击检测失败: {e}")
+            raise
+    
     def get_model_info(self) -> Dict:
         """获取模型信息"""
         # 处理 inference_data 的长度计算
@@ -669,16 +802,17 @@ class ThreatDetectionModel:
 
 # 全局模型实例
 threat_model = None
+_threat_model_lock = threading.Lock()
 
 def get_threat_model() -> ThreatDetectionModel:
-    """获取威胁检测模型单例"""
+    """获取威胁检测模型单例（加锁防止并发首次调用重复加载）"""
     global threat_model
     if threat_model is None:
-        threat_model = ThreatDetectionModel()
+        with _threat_model_lock:
+            if threat_model is None:
+                threat_model = ThreatDetectionModel()
     return threat_model
 
 def init_threat_model():
-    """初始化威胁检测模型"""
-    global threat_model
-    threat_model = ThreatDetectionModel()
-    return threat_model
\ No newline at end of file
+    """初始化威胁检测模型（已加载时复用，服务实例持有的就是同一个模型）"""
+    return get_threat_model()
\ No newline at end of file
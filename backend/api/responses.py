@@ -2,7 +2,7 @@
 API 标准化响应工具函数
 """
 from typing import Any, Dict, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi.responses import JSONResponse
 
 from .schemas import APISuccessResponse, APIErrorResponse
@@ -18,7 +18,7 @@ def create_success_response(
         "success": True,
         "data": data,
         "message": message,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
     
     return JSONResponse(
@@ -39,7 +39,7 @@ def create_error_response(
         "message": message,
         "error_code": error_code,
         "details": details,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
     
     return JSONResponse(
@@ -56,7 +56,7 @@ def create_health_response(
     response_data = {
         "status": status,
         "message": message,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
     
     return JSONResponse(
@@ -71,7 +71,7 @@ def success_response(data: Any, message: str = "操作成功"):
         "success": True,
         "data": data,
         "message": message,
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now(timezone.utc).isoformat()
     }
 
 
@@ -3,7 +3,7 @@ API 标准化请求和响应模型
 """
 from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 # ================== 基础响应模型 ==================
@@ -12,7 +12,7 @@ class APIResponse(BaseModel):
     """标准API响应基类"""
     success: bool = Field(..., description="操作是否成功")
     message: str = Field(..., description="响应消息")
-    timestamp: datetime = Field(default_factory=datetime.now, description="响应时间")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="响应时间")
 
 
 class APISuccessResponse(APIResponse):
@@ -32,7 +32,7 @@ class HealthResponse(BaseModel):
     """健康检查响应"""
     status: str = Field(..., description="服务状态")
     message: str = Field(..., description="状态消息")
-    timestamp: datetime = Field(default_factory=datetime.now, description="检查时间")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="检查时间")
 
 
 # ================== 攻击模拟相关模型 ==================
@@ -61,7 +61,9 @@ class ResponseAction(BaseModel):
 
 class AttackSimulationResult(BaseModel):
     """攻击模拟结果模型"""
-    detection_id: int = Field(..., description="检测ID")
+    detection_id: Optional[int] = Field(
+        None, description="检测ID；低置信度静默记录(silent_logging)延迟批量写入，此时为None"
+    )
     threat_info: ThreatInfo = Field(..., description="威胁信息")
     network_info: NetworkInfo = Field(..., description="网络信息")
     response_action: ResponseAction = Field(..., description="响应动作")
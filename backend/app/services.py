@@ -2,37 +2,130 @@
 业务逻辑服务层
 """
 
+import asyncio
+import csv
+import io
+import itertools
+import operator
 import random
-from datetime import datetime
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert, select, text, update
 from sqlalchemy.orm import Session
 import logging
 
-from ..database.models import Proposal, ExecutionLog, ThreatDetectionLog
+from ..database.connection import get_db_manager, json_dumps
+from ..database.models import Proposal, ExecutionLog, ThreatDetectionLog, isoformat_utc
 from ..blockchain.web3_manager import get_web3_manager
 from ..ai_module.model_loader import get_threat_model
-from ..config import THREAT_THRESHOLDS, INCENTIVE_CONFIG
+from ..config import THREAT_THRESHOLDS, INCENTIVE_CONFIG, DATABASE_CONFIG, GANACHE_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# IP地址各段的候选字符串（1-255），一次choices调用生成全部四段
+_IP_OCTETS = tuple(str(octet) for octet in range(1, 256))
+
+
+def _utc_now() -> datetime:
+    """当前UTC时间（naive），与数据库CURRENT_TIMESTAMP一致"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+_IP_POOL_MASK = 0xFFFF  # IP池大小为65536，按位与取模
+
+def _precompute_ip_pool(size: int) -> List[str]:
+    """预先生成一批随机IP地址字符串，模拟时循环取用"""
+    rng = random.Random()
+    return [".".join(rng.choices(_IP_OCTETS, k=4)) for _ in range(size)]
+
+# 响应级别 -> 采取的行动（批量模拟路径直接写入检测日志）
+BATCH_RESPONSE_ACTIONS = {
+    "automatic_response": "automatic_block",
+    "auto_create_proposal": "auto_proposal_created",
+    "manual_decision_alert": "manual_alert",
+    "silent_logging": "silent_logging",
+}
+
+# Manager贡献记录对外返回的字段（按顺序）
+CONTRIBUTION_FIELDS = ("address", "total_signatures", "avg_response_time",
+                       "quality_score", "last_signature_time")
+_get_contribution_fields = operator.itemgetter(*CONTRIBUTION_FIELDS)
+
+# 无状态响应结果（只读，按引用返回，避免每次检测重新构造）
+MANUAL_ALERT_ACTION = {
+    "action_taken": "manual_alert",
+    "description": "中低置信度威胁，已生成告警等待Operator手动决策"
+}
+SILENT_LOGGING_ACTION = {
+    "action_taken": "silent_logging",
+    "description": "低置信度事件，已静默记录"
+}
+
+# 可延迟写入的响应级别（前端和后续流程不依赖其数据库ID）；
+# 自动封锁和手动告警需要立即返回检测日志ID（手动提案依赖），仍同步写入
+DEFERRED_RESPONSE_ACTIONS = {
+    "silent_logging": SILENT_LOGGING_ACTION,
+}
+
+@dataclass
+class SimulateAttackResult:
+    """单次攻击模拟结果（槽位存储，避免每次请求分配实例字典）"""
+    __slots__ = ("detection_id", "threat_info", "network_info", "response_action", "timestamp")
+    
+    detection_id: Optional[int]  # 静默记录延迟批量写入，返回时尚未分配ID
+    threat_info: Dict
+    network_info: Dict
+    response_action: Dict
+    timestamp: str
+
 class ThreatDetectionService:
     """威胁检测服务"""
     
     def __init__(self):
         self.threat_model = get_threat_model()
         self.web3_manager = get_web3_manager()
+        
+        # 静默记录的检测日志先进入缓冲区，按条数或定时批量写入（写入失败时放回缓冲区重试）
+        self._deferred_detections = deque()
+        self._deferred_flush_timer = None
+        self._deferred_flush_lock = threading.Lock()
+        
+        # 随机IP池与游标（next()在GIL下原子，可跨线程共享）
+        self._ip_pool = _precompute_ip_pool(_IP_POOL_MASK + 1)
+        self._ip_cursor = itertools.count()
+        
+        # 响应级别 -> 处理函数（未知级别按静默记录处理）
+        self._response_handlers = {
+            "automatic_response": self._respond_automatic_block,
+            "auto_create_proposal": self._respond_auto_proposal,
+            "manual_decision_alert": self._respond_manual_alert,
+            "silent_logging": self._respond_silent_logging,
+        }
     
-    def simulate_attack(self, db: Session) -> Dict:
+    async def simulate_attack(self, db: Session) -> SimulateAttackResult:
         """模拟攻击检测"""
         try:
-            # 执行AI检测
-            detection_result = self.threat_model.simulate_attack_detection()
-            
-            # 生成模拟IP地址
+            # 在工作线程中执行AI检测，同时生成模拟IP地址
+            inference_task = asyncio.create_task(
+                asyncio.to_thread(self.threat_model.simulate_attack_detection)
+            )
             source_ip = self._generate_random_ip()
             target_ip = self._generate_random_ip()
+            detection_result = await inference_task
+            
+            # 低置信度事件不单独开事务，缓冲后批量写入
+            deferred_action = DEFERRED_RESPONSE_ACTIONS.get(detection_result['response_level'])
+            if deferred_action is not None:
+                return self._buffer_detection(detection_result, source_ip, target_ip, deferred_action)
             
             # 记录检测日志 - 使用true_label因为模型还有问题
+            # 检测时间在Python侧确定一次，同时用于日志记录和响应
+            detected_at = _utc_now()
             detection_log = ThreatDetectionLog(
                 threat_type=detection_result['true_label'],
                 confidence=detection_result['confidence'],
@@ -40,11 +133,12 @@ class ThreatDetectionService:
                 response_level=detection_result['response_level'],
                 source_ip=source_ip,
                 target_ip=target_ip,
-                detection_data=detection_result
+                detection_data=detection_result,
+                detected_at=detected_at
             )
             
             # 根据响应级别处理
-            response_action = self._handle_detection_response(
+            response_action = await self._handle_detection_response(
                 db, detection_result, detection_log, target_ip
             )
             
@@ -54,75 +148,317 @@ class ThreatDetectionService:
             detection_log.execution_log_id = response_action.get('execution_log_id')
             
             db.add(detection_log)
+            db.flush()
+            detection_id = detection_log.id  # 提交前取ID，避免提交后过期属性触发整行重新查询
             db.commit()
             
-            result = {
-                "detection_id": detection_log.id,
-                "threat_info": {
+            result = SimulateAttackResult(
+                detection_id=detection_id,
+                threat_info={
                     "predicted_class": detection_result['predicted_class'],
                     "confidence": detection_result['confidence'],
                     "true_label": detection_result['true_label'],
                     "response_level": detection_result['response_level']
                 },
-                "network_info": {
+                network_info={
                     "source_ip": source_ip,
                     "target_ip": target_ip
                 },
-                "response_action": response_action,
-                "timestamp": detection_log.detected_at.isoformat()
-            }
+                response_action=response_action,
+                timestamp=isoformat_utc(detected_at)
+            )
             
-            logger.info(f"🎯 攻击模拟完成: {detection_result['true_label']} "
-                       f"(置信度: {detection_result['confidence']:.4f}, 预测: {detection_result['predicted_class']})")
+            logger.info("🎯 攻击模拟完成: %s (置信度: %.4f, 预测: %s)",
+                        detection_result['true_label'], detection_result['confidence'],
+                        detection_result['predicted_class'])
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ 攻击模拟失败: {e}")
+            logger.error("❌ 攻击模拟失败: %s", e)
             db.rollback()
             raise
     
-    def _handle_detection_response(self, db: Session, detection_result: Dict, 
-                                 detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
-        """处理检测响应"""
-        response_level = detection_result['response_level']
+    def _buffer_detection(self, detection_result: Dict, source_ip: str, target_ip: str,
+                          response_action: Dict) -> SimulateAttackResult:
+        """缓冲检测日志并立即返回结果"""
+        detected_at = _utc_now()
+        self._deferred_detections.append({
+            "threat_type": detection_result['true_label'],
+            "confidence": detection_result['confidence'],
+            "true_label": detection_result['true_label'],
+            "response_level": detection_result['response_level'],
+            "source_ip": source_ip,
+            "target_ip": target_ip,
+            "action_taken": response_action['action_taken'],
+            "detection_data": detection_result,
+            "detected_at": detected_at
+        })
+        if len(self._deferred_detections) >= DATABASE_CONFIG['deferred_log_buffer_size']:
+            # 缓冲区已满（通常是数据库持续写入失败）：在当前线程同步写入，不丢弃记录
+            self.flush_deferred_detections()
+        else:
+            self._schedule_deferred_flush()
         
-        if response_level == "automatic_response":
-            # 高置信度：自动响应
-            execution_log = self._execute_automatic_response(
-                db, detection_result, target_ip
+        return SimulateAttackResult(
+            detection_id=None,
+            threat_info={
+                "predicted_class": detection_result['predicted_class'],
+                "confidence": detection_result['confidence'],
+                "true_label": detection_result['true_label'],
+                "response_level": detection_result['response_level']
+            },
+            network_info={
+                "source_ip": source_ip,
+                "target_ip": target_ip
+            },
+            response_action=response_action,
+            timestamp=isoformat_utc(detected_at)
+        )
+    
+    def _schedule_deferred_flush(self, retry: bool = False):
+        """确保有一个待执行的刷新定时器；缓冲条数达到阈值时立即刷新（写入失败后的重试按间隔等待）"""
+        flush_now = (not retry
+                     and len(self._deferred_detections) >= DATABASE_CONFIG['deferred_log_flush_size'])
+        with self._deferred_flush_lock:
+            if self._deferred_flush_timer is not None:
+                if not flush_now:
+                    return
+                self._deferred_flush_timer.cancel()
+            self._deferred_flush_timer = threading.Timer(
+                0 if flush_now else DATABASE_CONFIG['deferred_log_flush_interval'],
+                self.flush_deferred_detections
+            )
+            self._deferred_flush_timer.daemon = True
+            self._deferred_flush_timer.start()
+    
+    def flush_deferred_detections(self) -> int:
+        """将缓冲的检测日志批量写入数据库，返回写入条数"""
+        with self._deferred_flush_lock:
+            if self._deferred_flush_timer is not None:
+                self._deferred_flush_timer.cancel()
+                self._deferred_flush_timer = None
+        
+        rows = []
+        while self._deferred_detections:
+            rows.append(self._deferred_detections.popleft())
+        if not rows:
+            return 0
+        
+        try:
+            with get_db_manager().session_scope() as db:
+                self._insert_detection_logs(db, rows)
+            logger.debug("静默检测日志批量写入: %s 条", len(rows))
+            return len(rows)
+        except Exception as e:
+            # 按原顺序放回缓冲区头部，等待下次刷新重试
+            self._deferred_detections.extendleft(reversed(rows))
+            self._schedule_deferred_flush(retry=True)
+            logger.error("❌ 静默检测日志批量写入失败（%s 条已放回缓冲区等待重试）: %s", len(rows), e)
+            return 0
+    
+    async def simulate_attack_batch(self, db: Session, count: int) -> Dict:
+        """批量模拟攻击检测（每张表一次 INSERT ... RETURNING 批量写入）"""
+        try:
+            # 在工作线程中对整批样本执行一次AI推理
+            detection_results = await asyncio.to_thread(
+                self.threat_model.simulate_attack_detections, count
             )
-            return {
-                "action_taken": "automatic_block",
-                "execution_log_id": execution_log.id,
-                "description": "高置信度威胁，自动执行封锁"
-            }
             
-        elif response_level == "auto_create_proposal":
-            # 中高置信度：自动创建提案
-            proposal = self._create_auto_proposal(db, detection_result, target_ip)
-            return {
-                "action_taken": "auto_proposal_created",
-                "proposal_id": proposal.id,
-                "description": "中高置信度威胁，已自动创建提案等待Manager审批"
-            }
+            detection_rows = []
+            for detection_result in detection_results:
+                detection_rows.append({
+                    "threat_type": detection_result['true_label'],
+                    "confidence": detection_result['confidence'],
+                    "true_label": detection_result['true_label'],
+                    "response_level": detection_result['response_level'],
+                    "source_ip": self._generate_random_ip(),
+                    "target_ip": self._generate_random_ip(),
+                    "action_taken": BATCH_RESPONSE_ACTIONS.get(
+                        detection_result['response_level'], "silent_logging"
+                    ),
+                    "detection_data": detection_result
+                })
             
-        elif response_level == "manual_decision_alert":
-            # 中低置信度：人工决策告警
-            return {
-                "action_taken": "manual_alert",
-                "description": "中低置信度威胁，已生成告警等待Operator手动决策"
-            }
+            detection_ids = self._insert_detection_logs(db, detection_rows)
+            
+            # 高置信度：批量写入自动封锁执行日志
+            auto_block = [
+                (detection_id, row, result)
+                for detection_id, row, result in zip(detection_ids, detection_rows, detection_results)
+                if result['response_level'] == "automatic_response"
+            ]
+            execution_ids = self._insert_auto_block_logs(db, auto_block)
+            
+            # 中高置信度：先创建合约提案，再批量写入提案记录
+            auto_proposal = [
+                (detection_id, row, result)
+                for detection_id, row, result in zip(detection_ids, detection_rows, detection_results)
+                if result['response_level'] == "auto_create_proposal"
+            ]
+            proposal_ids = []
+            if auto_proposal:
+                multisig_results = await asyncio.to_thread(lambda: [
+                    self.web3_manager.create_multisig_proposal(
+                        target_role="manager_0",
+                        amount_eth=INCENTIVE_CONFIG['proposal_reward'],
+                        data="0x",
+                        creator_role="system"
+                    ) for _ in auto_proposal
+                ])
+                proposal_ids = db.scalars(
+                    insert(Proposal).returning(Proposal.id, sort_by_parameter_order=True),
+                    [{
+                        "threat_type": result['predicted_class'],
+                        "confidence": result['confidence'],
+                        "true_label": result['true_label'],
+                        "proposal_type": "auto",
+                        "target_ip": row["target_ip"],
+                        "action_type": "block",
+                        "detection_log_id": detection_id,
+                        "contract_proposal_id": multisig_result.get("proposal_id") if multisig_result["success"] else None,
+                        "contract_address": multisig_result.get("contract_address") if multisig_result["success"] else None
+                    } for (detection_id, row, result), multisig_result in zip(auto_proposal, multisig_results)]
+                ).all()
+                db.execute(update(ThreatDetectionLog), [
+                    {"id": detection_id, "proposal_id": proposal_id}
+                    for (detection_id, _, _), proposal_id in zip(auto_proposal, proposal_ids)
+                ])
+            
+            db.commit()
+            
+            level_counts = {}
+            for result in detection_results:
+                level_counts[result['response_level']] = level_counts.get(result['response_level'], 0) + 1
+            
+            logger.info("🎯 批量攻击模拟完成: %s 条检测, %s 次自动封锁, %s 个自动提案",
+                        count, len(execution_ids), len(proposal_ids))
             
-        else:
-            # 低置信度：静默记录
             return {
-                "action_taken": "silent_logging",
-                "description": "低置信度事件，已静默记录"
+                "count": count,
+                "detection_ids": list(detection_ids),
+                "execution_log_ids": list(execution_ids),
+                "proposal_ids": list(proposal_ids),
+                "response_levels": level_counts,
+                "timestamp": datetime.now(timezone.utc).isoformat()
             }
+            
+        except Exception as e:
+            logger.error("❌ 批量攻击模拟失败: %s", e)
+            db.rollback()
+            raise
+    
+    def _insert_auto_block_logs(self, db: Session,
+                                auto_block: List[Tuple[int, Dict, Dict]]) -> List[int]:
+        """为(检测日志ID, 检测行, 检测结果)批量写入自动封锁执行日志并回填检测日志"""
+        if not auto_block:
+            return []
+        
+        execution_ids = db.scalars(
+            insert(ExecutionLog).returning(ExecutionLog.id, sort_by_parameter_order=True),
+            [{
+                "action_type": "auto_block",
+                "target_ip": row["target_ip"],
+                "threat_type": result['predicted_class'],
+                "confidence": result['confidence'],
+                "execution_status": "success",
+                "execution_details": f"自动封锁IP {row['target_ip']}，威胁类型: {result['predicted_class']}",
+                "detection_log_id": detection_id
+            } for detection_id, row, result in auto_block]
+        ).all()
+        db.execute(update(ThreatDetectionLog), [
+            {"id": detection_id, "execution_log_id": execution_id}
+            for (detection_id, _, _), execution_id in zip(auto_block, execution_ids)
+        ])
+        return execution_ids
+    
+    def _insert_detection_logs(self, db: Session, rows: List[Dict]) -> List[int]:
+        """批量写入检测日志并按输入顺序返回ID"""
+        if (db.get_bind().dialect.name == "postgresql"
+                and len(rows) >= DATABASE_CONFIG['bulk_copy_threshold']):
+            return self._copy_detection_logs(db, rows)
+        
+        return db.scalars(
+            insert(ThreatDetectionLog).returning(ThreatDetectionLog.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+    
+    def _copy_detection_logs(self, db: Session, rows: List[Dict]) -> List[int]:
+        """PostgreSQL大批量写入：预分配序列ID后通过COPY一次性导入（需要psycopg2）"""
+        table = ThreatDetectionLog.__table__
+        allocated = db.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')), now() "
+                 "FROM generate_series(1, :count)"),
+            {"table": table.name, "count": len(rows)}
+        ).all()
+        
+        # 行数据自带detected_at时（缓冲的静默记录）保留原检测时间
+        records = [
+            {"id": detection_id, "detected_at": detected_at, **row}
+            for (detection_id, detected_at), row in zip(allocated, rows)
+        ]
+        columns = list(records[0].keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow([
+                json_dumps(value) if isinstance(value, dict)
+                else value.isoformat() if isinstance(value, datetime)
+                else value
+                for value in record.values()
+            ])
+        buffer.seek(0)
+        
+        with db.connection().connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        
+        return [detection_id for detection_id, _ in allocated]
+    
+    async def _handle_detection_response(self, db: Session, detection_result: Dict, 
+                                         detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
+        """处理检测响应"""
+        handler = self._response_handlers.get(
+            detection_result['response_level'], self._respond_silent_logging
+        )
+        return await handler(db, detection_result, detection_log, target_ip)
+    
+    async def _respond_automatic_block(self, db: Session, detection_result: Dict,
+                                       detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
+        """高置信度：自动响应"""
+        execution_log = self._execute_automatic_response(
+            db, detection_result, detection_log, target_ip
+        )
+        return {
+            "action_taken": "automatic_block",
+            "execution_log_id": execution_log.id,
+            "description": "高置信度威胁，自动执行封锁"
+        }
+    
+    async def _respond_auto_proposal(self, db: Session, detection_result: Dict,
+                                     detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
+        """中高置信度：自动创建提案"""
+        proposal = await self._create_auto_proposal(db, detection_result, detection_log, target_ip)
+        return {
+            "action_taken": "auto_proposal_created",
+            "proposal_id": proposal.id,
+            "description": "中高置信度威胁，已自动创建提案等待Manager审批"
+        }
+    
+    async def _respond_manual_alert(self, db: Session, detection_result: Dict,
+                                    detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
+        """中低置信度：人工决策告警"""
+        return MANUAL_ALERT_ACTION
+    
+    async def _respond_silent_logging(self, db: Session, detection_result: Dict,
+                                      detection_log: ThreatDetectionLog, target_ip: str) -> Dict:
+        """低置信度：静默记录"""
+        return SILENT_LOGGING_ACTION
     
     def _execute_automatic_response(self, db: Session, detection_result: Dict, 
-                                  target_ip: str) -> ExecutionLog:
+                                  detection_log: ThreatDetectionLog, target_ip: str) -> ExecutionLog:
         """执行自动响应"""
         execution_log = ExecutionLog(
             action_type="auto_block",
@@ -131,17 +467,17 @@ class ThreatDetectionService:
             confidence=detection_result['confidence'],
             execution_status="success",
             execution_details=f"自动封锁IP {target_ip}，威胁类型: {detection_result['predicted_class']}",
-            execution_data=detection_result
+            detection_log=detection_log
         )
         
         db.add(execution_log)
         db.flush()  # 获取ID
         
-        logger.info(f"🚫 自动执行封锁: {target_ip}")
+        logger.info("🚫 自动执行封锁: %s", target_ip)
         return execution_log
     
-    def _create_auto_proposal(self, db: Session, detection_result: Dict, 
-                            target_ip: str) -> Proposal:
+    async def _create_auto_proposal(self, db: Session, detection_result: Dict, 
+                                  detection_log: ThreatDetectionLog, target_ip: str) -> Proposal:
         """创建自动提案 (使用MultiSig合约)"""
         proposal = Proposal(
             threat_type=detection_result['predicted_class'],
@@ -150,14 +486,16 @@ class ThreatDetectionService:
             proposal_type="auto",
             target_ip=target_ip,
             action_type="block",
-            detection_data=detection_result
+            detection_log=detection_log
         )
         
         db.add(proposal)
         db.flush()  # 获取ID
         
-        # 使用MultiSig合约创建提案（系统自动创建，不需要角色验证）
-        multisig_result = self.web3_manager.create_multisig_proposal(
+        # 数据库记录写入成功后再创建合约提案，避免写入失败时留下没有对应记录的链上提案
+        # 使用MultiSig合约创建提案（系统自动创建，不需要角色验证），在工作线程中执行不阻塞事件循环
+        multisig_result = await asyncio.to_thread(
+            self.web3_manager.create_multisig_proposal,
             target_role="manager_0",  # 奖励目标（这里可以动态确定）
             amount_eth=INCENTIVE_CONFIG['proposal_reward'],
             data="0x",
@@ -169,17 +507,17 @@ class ThreatDetectionService:
             proposal.contract_proposal_id = multisig_result["proposal_id"]
             proposal.contract_address = multisig_result["contract_address"]
             
-            logger.info(f"📝 自动创建MultiSig提案: DB-ID-{proposal.id}, Contract-ID-{multisig_result['proposal_id']}")
+            logger.info("📝 自动创建MultiSig提案: DB-ID-%s, Contract-ID-%s", proposal.id, multisig_result['proposal_id'])
         else:
-            logger.error(f"❌ MultiSig提案创建失败: {multisig_result['error']}")
+            logger.error("❌ MultiSig提案创建失败: %s", multisig_result['error'])
             # 继续使用传统模式
             proposal.contract_proposal_id = None
         
         return proposal
     
     def _generate_random_ip(self) -> str:
-        """生成随机IP地址"""
-        return f"{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}.{random.randint(1, 255)}"
+        """生成随机IP地址（从预生成的IP池中循环取用）"""
+        return self._ip_pool[next(self._ip_cursor) & _IP_POOL_MASK]
 
 class ProposalService:
     """提案管理服务"""
@@ -213,7 +551,7 @@ class ProposalService:
                 proposal_type="manual",
                 target_ip=detection_log.target_ip,
                 action_type=operator_action,
-                detection_data=detection_log.detection_data
+                detection_log_id=detection_log.id
             )
             
             db.add(proposal)
@@ -231,18 +569,16 @@ class ProposalService:
                 if multisig_result["success"]:
                     proposal.contract_proposal_id = multisig_result["proposal_id"]
                     proposal.contract_address = multisig_result["contract_address"]
-                    logger.info(f"📝 手动创建MultiSig提案: DB-ID-{proposal.id}, Contract-ID-{multisig_result['proposal_id']}, Creator-{operator_role}")
+                    logger.info("📝 手动创建MultiSig提案: DB-ID-%s, Contract-ID-%s, Creator-%s", proposal.id, multisig_result['proposal_id'], operator_role)
                 else:
-                    logger.error(f"❌ MultiSig提案创建失败: {multisig_result['error']}")
-            
-            db.commit()
+                    logger.error("❌ MultiSig提案创建失败: %s", multisig_result['error'])
             
-            # 更新检测日志
+            # 更新检测日志，与提案在同一事务中提交
             detection_log.proposal_id = proposal.id
             detection_log.action_taken = "manual_proposal_created"
             db.commit()
             
-            logger.info(f"📝 手动创建提案: ID-{proposal.id} by {operator_role or 'Operator'}")
+            logger.info("📝 手动创建提案: ID-%s by %s", proposal.id, operator_role or 'Operator')
             
             return {
                 "proposal_id": proposal.id,
@@ -253,7 +589,7 @@ class ProposalService:
             }
             
         except Exception as e:
-            logger.error(f"❌ 手动创建提案失败: {e}")
+            logger.error("❌ 手动创建提案失败: %s", e)
             db.rollback()
             raise
     
@@ -282,24 +618,26 @@ class ProposalService:
                 )
                 
                 if multisig_result["success"]:
-                    logger.info(f"✅ MultiSig合约签名成功: Contract-ID-{proposal.contract_proposal_id} by {manager_role}")
+                    # 签名会更新Manager贡献度（执行时还会发送奖励）
+                    RewardPoolService.invalidate_cache()
+                    logger.info("✅ MultiSig合约签名成功: Contract-ID-%s by %s", proposal.contract_proposal_id, manager_role)
                 else:
-                    logger.error(f"❌ MultiSig合约签名失败: {multisig_result['error']}")
+                    logger.error("❌ MultiSig合约签名失败: %s", multisig_result['error'])
                     # 如果合约签名失败，可能是角色权限问题
                     if "not authorized" in multisig_result.get("error", "").lower():
                         raise ValueError(f"Manager {manager_role} 没有权限签名此提案")
             
-            # 更新传统签名信息（向后兼容）
-            signed_by.append(manager_role)
-            proposal.signed_by = signed_by
-            proposal.signatures_count = len(signed_by)
+            # 更新传统签名信息（向后兼容）- 原子追加，避免并发签名丢失更新
+            stmt = Proposal.append_signer_stmt(db.get_bind().dialect.name, proposal_id, manager_role)
+            if db.execute(stmt).scalar() is None:
+                raise ValueError(f"Manager {manager_role} 已经签名过此提案")
             
             # 检查是否达到签名要求
             if proposal.signatures_count >= proposal.signatures_required:
                 # 提案通过，执行操作
                 result = self._execute_approved_proposal(db, proposal, manager_role)
                 proposal.status = "approved"
-                proposal.approved_at = datetime.now()
+                proposal.approved_at = func.now()  # 由数据库时钟填充
                 
                 # 如果使用了MultiSig合约且执行成功
                 if multisig_result and multisig_result.get("executed"):
@@ -314,11 +652,11 @@ class ProposalService:
             
             db.commit()
             
-            logger.info(f"✅ 提案签名成功: DB-ID-{proposal_id} by {manager_role}")
+            logger.info("✅ 提案签名成功: DB-ID-%s by %s", proposal_id, manager_role)
             return result
             
         except Exception as e:
-            logger.error(f"❌ 提案签名失败: {e}")
+            logger.error("❌ 提案签名失败: %s", e)
             db.rollback()
             raise
     
@@ -336,7 +674,8 @@ class ProposalService:
                 execution_status="success",
                 execution_details=f"提案批准后执行{proposal.action_type}操作",
                 manager_account=self.web3_manager.accounts.get(final_signer, "unknown"),
-                execution_data=proposal.detection_data
+                detection_log_id=proposal.detection_log_id,
+                execution_data=proposal.detection_data  # 仅旧提案记录带有内联检测数据
             )
             
             db.add(execution_log)
@@ -346,6 +685,7 @@ class ProposalService:
             reward_result = self.web3_manager.send_reward("treasury", final_signer)
             
             if reward_result["success"]:
+                RewardPoolService.invalidate_cache("pool_info")
                 # 更新提案的奖励信息
                 proposal.reward_paid = True
                 proposal.reward_recipient = final_signer
@@ -354,11 +694,11 @@ class ProposalService:
                 # 更新执行日志
                 execution_log.reward_tx_hash = reward_result["tx_hash"]
                 
-                logger.info(f"💰 奖励发送成功: {final_signer} 获得 {INCENTIVE_CONFIG['proposal_reward']} ETH")
+                logger.info("💰 奖励发送成功: %s 获得 %s ETH", final_signer, INCENTIVE_CONFIG['proposal_reward'])
             else:
-                logger.error(f"❌ 奖励发送失败: {reward_result['error']}")
+                logger.error("❌ 奖励发送失败: %s", reward_result['error'])
             
-            proposal.executed_at = datetime.now()
+            proposal.executed_at = func.now()
             
             # 准备返回结果
             result = {
@@ -381,7 +721,7 @@ class ProposalService:
                 if auto_distribution.get("success"):
                     distributions = auto_distribution.get("distributions", [])
                     if distributions:
-                        logger.info(f"💰 自动分配奖励完成: 分配给 {len(distributions)} 个Manager")
+                        logger.info("💰 自动分配奖励完成: 分配给 %s 个Manager", len(distributions))
                         # 在返回结果中包含自动分配信息
                         result["auto_distributed"] = True
                         result["distribution_amount"] = auto_distribution.get("total_distributed", 0)
@@ -389,26 +729,46 @@ class ProposalService:
                     else:
                         logger.info("💰 自动分配奖励: 暂无符合条件的Manager")
                 else:
-                    logger.warning(f"💰 自动分配奖励未触发: {auto_distribution.get('message')}")
+                    logger.warning("💰 自动分配奖励未触发: %s", auto_distribution.get('message'))
                     
             except Exception as e:
-                logger.error(f"❌ 自动分配奖励失败: {e}")
+                logger.error("❌ 自动分配奖励失败: %s", e)
             
             return result
             
         except Exception as e:
-            logger.error(f"❌ 执行提案失败: {e}")
+            logger.error("❌ 执行提案失败: %s", e)
             raise
     
-    def get_pending_proposals(self, db: Session) -> List[Dict]:
-        """获取待处理提案"""
-        proposals = db.query(Proposal).filter(Proposal.status == "pending").order_by(Proposal.created_at.desc()).all()
-        return [proposal.to_dict() for proposal in proposals]
+    def get_proposals_by_statuses(self, db: Session, statuses: Iterable[str],
+                                  limit: int = 200) -> Dict[str, List[Dict]]:
+        """一次查询获取多个状态的提案，按状态分组（各组按创建时间倒序）
+
+        查询走 ix_proposals_status_created_at 复合索引，避免按状态逐个往返数据库。
+        limit为本次查询返回的总行数上限。
+        """
+        statuses = tuple(statuses)
+        grouped: Dict[str, List[Dict]] = defaultdict(list)
+        rows = db.execute(
+            Proposal.list_select()
+            .where(Proposal.status.in_(statuses))
+            .order_by(Proposal.created_at.desc())
+            .limit(limit)
+        ).mappings()
+        for row in rows:
+            grouped[row["status"]].append(Proposal.row_to_dict(row))
+        return {status: grouped.get(status, []) for status in statuses}
+    
+    def get_pending_proposals(self, db: Session, limit: int = 200) -> List[Dict]:
+        """获取待处理提案（按创建时间倒序，最多limit条）"""
+        return self.get_proposals_by_statuses(db, ("pending",), limit)["pending"]
     
     def get_proposal_history(self, db: Session, limit: int = 50) -> List[Dict]:
         """获取提案历史"""
-        proposals = db.query(Proposal).order_by(Proposal.created_at.desc()).limit(limit).all()
-        return [proposal.to_dict() for proposal in proposals]
+        rows = db.execute(
+            Proposal.list_select().order_by(Proposal.created_at.desc()).limit(limit)
+        ).mappings()
+        return [Proposal.row_to_dict(row) for row in rows]
 
 class SystemInfoService:
     """系统信息服务"""
@@ -416,52 +776,95 @@ class SystemInfoService:
     def __init__(self):
         self.web3_manager = get_web3_manager()
         self.threat_model = get_threat_model()
+        self._model_info: Optional[Dict] = None  # 模型信息在进程生命周期内不变
+        self._network_info: Optional[Tuple[float, Dict]] = None  # (缓存时间, 网络信息)
     
-    def get_system_status(self, db: Session) -> Dict:
+    async def get_system_status(self, db: Session) -> Dict:
         """获取系统状态"""
-        # 网络信息
-        network_info = self.web3_manager.get_network_info()
-        
-        # 账户信息
-        accounts_info = self.web3_manager.get_all_accounts_info()
-        
-        # 模型信息
-        model_info = self.threat_model.get_model_info()
+        # 网络信息、账户信息、模型信息在工作线程中并发获取
+        info_tasks = asyncio.gather(
+            asyncio.to_thread(self._get_network_info),
+            asyncio.to_thread(self.web3_manager.get_all_accounts_info),
+            asyncio.to_thread(self._get_model_info)
+        )
         
-        # 数据库统计
+        # 数据库统计（会话不跨线程使用，在当前线程中执行）
         db_stats = self._get_database_stats(db)
         
+        network_info, accounts_info, model_info = await info_tasks
+        
         return {
             "network": network_info,
             "accounts": accounts_info,
             "ai_model": model_info,
             "database": db_stats,
             "thresholds": THREAT_THRESHOLDS,
-            "system_time": datetime.now().isoformat()
+            "system_time": datetime.now(timezone.utc).isoformat()
         }
     
+    def _get_model_info(self) -> Dict:
+        """获取模型信息（首次调用后缓存）"""
+        if self._model_info is None:
+            self._model_info = self.threat_model.get_model_info()
+        return self._model_info
+    
+    def _get_network_info(self) -> Dict:
+        """获取网络信息（出块间隔内复用，区块高度不会更快变化）"""
+        now = time.monotonic()
+        if self._network_info and now - self._network_info[0] < GANACHE_CONFIG['block_time']:
+            return self._network_info[1]
+        network_info = self.web3_manager.get_network_info()
+        self._network_info = (now, network_info)
+        return network_info
+    
     def _get_database_stats(self, db: Session) -> Dict:
-        """获取数据库统计信息"""
-        return {
-            "total_detections": db.query(ThreatDetectionLog).count(),
-            "total_proposals": db.query(Proposal).count(),
-            "pending_proposals": db.query(Proposal).filter(Proposal.status == "pending").count(),
-            "total_executions": db.query(ExecutionLog).count()
-        }
+        """获取数据库统计信息（标量子查询合并为一次查询）"""
+        row = db.execute(select(
+            select(func.count()).select_from(ThreatDetectionLog).scalar_subquery().label("total_detections"),
+            select(func.count()).select_from(Proposal).scalar_subquery().label("total_proposals"),
+            select(func.count()).select_from(Proposal).where(Proposal.status == "pending")
+            .scalar_subquery().label("pending_proposals"),
+            select(func.count()).select_from(ExecutionLog).scalar_subquery().label("total_executions")
+        )).one()
+        return dict(row._mapping)
 
 class RewardPoolService:
     """奖金池管理服务"""
     
+    # 查询结果短期缓存（所有实例共享）：key -> (缓存时间, 结果)
+    _query_cache: Dict[str, Tuple[float, Dict]] = {}
+    
     def __init__(self):
         self.web3_manager = get_web3_manager()
     
+    @classmethod
+    def invalidate_cache(cls, *keys: str):
+        """使查询缓存失效（不指定key时全部清除）"""
+        if not keys:
+            cls._query_cache.clear()
+        for key in keys:
+            cls._query_cache.pop(key, None)
+    
+    def _cached_query(self, key: str, loader: Callable[[], Dict]) -> Dict:
+        """在TTL内复用成功的查询结果"""
+        entry = self._query_cache.get(key)
+        now = time.monotonic()
+        if entry and now - entry[0] < INCENTIVE_CONFIG['query_cache_ttl']:
+            return entry[1]
+        
+        result = loader()
+        if result.get("success"):
+            self._query_cache[key] = (now, result)
+        return result
+    
     def deposit_to_reward_pool(self, from_role: str, amount_eth: float) -> Dict:
         """向奖金池充值"""
         try:
             result = self.web3_manager.deposit_to_reward_pool(from_role, amount_eth)
             
             if result["success"]:
-                logger.info(f"💰 奖金池充值成功: {amount_eth} ETH from {from_role}")
+                self.invalidate_cache("pool_info")
+                logger.info("💰 奖金池充值成功: %s ETH from %s", amount_eth, from_role)
                 return {
                     "success": True,
                     "message": f"Successfully deposited {amount_eth} ETH to reward pool",
@@ -471,7 +874,7 @@ class RewardPoolService:
                     "tx_hash": result.get("tx_hash")
                 }
             else:
-                logger.error(f"❌ 奖金池充值失败: {result['error']}")
+                logger.error("❌ 奖金池充值失败: %s", result['error'])
                 return {
                     "success": False,
                     "error": result["error"],
@@ -479,7 +882,7 @@ class RewardPoolService:
                 }
         
         except Exception as e:
-            logger.error(f"❌ 奖金池充值异常: {e}")
+            logger.error("❌ 奖金池充值异常: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -488,6 +891,10 @@ class RewardPoolService:
     
     def get_reward_pool_info(self) -> Dict:
         """获取奖金池信息"""
+        return self._cached_query("pool_info", self._load_reward_pool_info)
+    
+    def _load_reward_pool_info(self) -> Dict:
+        """从Web3Manager读取奖金池信息"""
         try:
             result = self.web3_manager.get_reward_pool_info()
             
@@ -516,7 +923,7 @@ class RewardPoolService:
                 }
         
         except Exception as e:
-            logger.error(f"❌ 获取奖金池信息失败: {e}")
+            logger.error("❌ 获取奖金池信息失败: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -528,6 +935,10 @@ class RewardPoolService:
     
     def get_manager_contributions(self) -> Dict:
         """获取所有Manager贡献记录"""
+        return self._cached_query("contributions", self._load_manager_contributions)
+    
+    def _load_manager_contributions(self) -> Dict:
+        """从Web3Manager读取并格式化Manager贡献记录"""
         try:
             result = self.web3_manager.get_all_manager_contributions()
             
@@ -535,16 +946,13 @@ class RewardPoolService:
                 contributions = result["contributions"]
                 
                 # 格式化贡献数据
-                formatted_contributions = {}
-                for manager_role, contrib_data in contributions.items():
-                    formatted_contributions[manager_role] = {
-                        "address": contrib_data["address"],
-                        "total_signatures": contrib_data["total_signatures"],
-                        "avg_response_time": contrib_data["avg_response_time"],
-                        "quality_score": contrib_data["quality_score"],
-                        "last_signature_time": contrib_data["last_signature_time"],
-                        "performance_grade": self._calculate_performance_grade(contrib_data)
-                    }
+                formatted_contributions = {
+                    manager_role: dict(
+                        zip(CONTRIBUTION_FIELDS, _get_contribution_fields(contrib_data)),
+                        performance_grade=self._calculate_performance_grade(contrib_data)
+                    )
+                    for manager_role, contrib_data in contributions.items()
+                }
                 
                 return {
                     "success": True,
@@ -558,7 +966,7 @@ class RewardPoolService:
                 }
         
         except Exception as e:
-            logger.error(f"❌ 获取Manager贡献记录失败: {e}")
+            logger.error("❌ 获取Manager贡献记录失败: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -571,10 +979,11 @@ class RewardPoolService:
             result = self.web3_manager.distribute_contribution_rewards(admin_role)
             
             if result["success"]:
+                self.invalidate_cache("pool_info")
                 distributions = result.get("distributions", [])
                 total_distributed = result.get("total_distributed", 0)
                 
-                logger.info(f"🎁 贡献奖励分配完成: 总计 {total_distributed} ETH 分配给 {len(distributions)} 位Manager")
+                logger.info("🎁 贡献奖励分配完成: 总计 %s ETH 分配给 %s 位Manager", total_distributed, len(distributions))
                 
                 return {
                     "success": True,
@@ -585,7 +994,7 @@ class RewardPoolService:
                     "distributed_at": result.get("distributed_at")
                 }
             else:
-                logger.error(f"❌ 贡献奖励分配失败: {result['error']}")
+                logger.error("❌ 贡献奖励分配失败: %s", result['error'])
                 return {
                     "success": False,
                     "error": result["error"],
@@ -593,21 +1002,21 @@ class RewardPoolService:
                 }
         
         except Exception as e:
-            logger.error(f"❌ 贡献奖励分配异常: {e}")
+            logger.error("❌ 贡献奖励分配异常: %s", e)
             return {
                 "success": False,
                 "error": str(e),
                 "message": "Exception during reward distribution"
             }
     
-    def get_reward_pool_dashboard(self) -> Dict:
+    async def get_reward_pool_dashboard(self) -> Dict:
         """获取奖金池仪表板数据"""
         try:
-            # 获取奖金池信息
-            pool_result = self.get_reward_pool_info()
-            
-            # 获取Manager贡献信息
-            contrib_result = self.get_manager_contributions()
+            # 并发获取奖金池信息和Manager贡献信息
+            pool_result, contrib_result = await asyncio.gather(
+                asyncio.to_thread(self.get_reward_pool_info),
+                asyncio.to_thread(self.get_manager_contributions)
+            )
             
             # 计算统计数据
             total_signatures = 0
@@ -628,7 +1037,7 @@ class RewardPoolService:
                     "total_managers": 3,
                     "pool_utilization": self._calculate_pool_utilization(pool_result.get("pool_info", {}))
                 },
-                "last_updated": datetime.now().isoformat()
+                "last_updated": datetime.now(timezone.utc).isoformat()
             }
             
             return {
@@ -637,7 +1046,7 @@ class RewardPoolService:
             }
         
         except Exception as e:
-            logger.error(f"❌ 获取奖金池仪表板失败: {e}")
+            logger.error("❌ 获取奖金池仪表板失败: %s", e)
             return {
                 "success": False,
                 "error": str(e),
@@ -646,11 +1055,17 @@ class RewardPoolService:
     
     def _calculate_performance_grade(self, contrib_data: Dict) -> str:
         """计算Manager性能等级"""
-        signatures = contrib_data.get("total_signatures", 0)
-        quality_score = contrib_data.get("quality_score", 0)
-        
+        return self._performance_grade(
+            contrib_data.get("total_signatures", 0),
+            contrib_data.get("quality_score", 0)
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _performance_grade(signatures: int, quality_score: int) -> str:
+        """根据签名次数和质量评分计算性能等级"""
         # 计算综合贡献度（0-100分）
-        contribution_score = self._calculate_contribution_score(signatures, quality_score)
+        contribution_score = RewardPoolService._calculate_contribution_score(signatures, quality_score)
         
         if signatures == 0:
             return "No Activity"
@@ -663,7 +1078,9 @@ class RewardPoolService:
         else:
             return "Needs Improvement"
     
-    def _calculate_contribution_score(self, total_signatures: int, quality_score: int) -> float:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _calculate_contribution_score(total_signatures: int, quality_score: int) -> float:
         """计算贡献度评分（0-100分）"""
         # 签名次数得分（10次签名满分，占50%权重）
         signature_score = min(100, total_signatures * 10)
@@ -708,51 +1125,49 @@ class RewardPoolService:
             distribution_amount = 1.0
             distributions = []
             
+            rewards = []
             for manager_role, contribution_score in eligible_managers.items():
                 reward_amount = (contribution_score / total_contribution_score) * distribution_amount
                 
                 if reward_amount > 0.001:  # 最小奖励阈值
-                    reward_result = self.web3_manager.send_reward('treasury', manager_role, reward_amount)
-                    
-                    if reward_result["success"]:
-                        distributions.append({
-                            "manager_role": manager_role,
-                            "reward_amount": reward_amount,
-                            "contribution_score": contribution_score,
-                            "tx_hash": reward_result["tx_hash"]
-                        })
+                    rewards.append((manager_role, reward_amount))
+            
+            # 一次性提交所有奖励交易并并发等待确认
+            reward_results = self.web3_manager.send_rewards('treasury', rewards)
+            
+            total_distributed = 0.0
+            for (manager_role, reward_amount), reward_result in zip(rewards, reward_results):
+                if reward_result["success"]:
+                    total_distributed += reward_amount
+                    distributions.append({
+                        "manager_role": manager_role,
+                        "reward_amount": reward_amount,
+                        "contribution_score": eligible_managers[manager_role],
+                        "tx_hash": reward_result["tx_hash"]
+                    })
             
             # 更新奖金池余额（模拟）
-            total_distributed = sum(d["reward_amount"] for d in distributions)
             if hasattr(self.web3_manager, 'multisig_contract') and self.web3_manager.multisig_contract:
                 self.web3_manager.multisig_contract.reward_pool_balance -= total_distributed
                 # 保存奖金池状态
                 self.web3_manager.multisig_contract._save_reward_pool_state()
+            if distributions:
+                self.invalidate_cache("pool_info")
             
-            logger.info(f"🎁 自动分配完成: {len(distributions)}位Manager获得奖励，总计{total_distributed} ETH")
+            logger.info("🎁 自动分配完成: %s位Manager获得奖励，总计%s ETH", len(distributions), total_distributed)
             
             return {
                 "success": True,
                 "message": f"Successfully distributed {total_distributed} ETH to {len(distributions)} managers",
                 "distributions": distributions,
                 "total_distributed": total_distributed,
-                "distributed_at": datetime.now().isoformat()
+                "distributed_at": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
-            logger.error(f"❌ 自动分配奖励失败: {e}")
+            logger.error("❌ 自动分配奖励失败: %s", e)
             return {"success": False, "error": str(e)}
     
-    def _calculate_contribution_score(self, total_signatures: int, quality_score: int) -> float:
-        """计算贡献度评分（0-100分）"""
-        # 签名次数得分（10次签名满分，占50%权重）
-        signature_score = min(100, total_signatures * 10)
-        
-        # 综合贡献度：签名次数50% + 质量评分50%
-        contribution_score = signature_score * 0.5 + quality_score * 0.5
-        
-        return contribution_score
-    
     def _calculate_pool_utilization(self, pool_info: Dict) -> float:
         """计算奖金池利用率"""
         balance = pool_info.get("balance", 0)
@@ -5,14 +5,23 @@
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Callable
-from web3 import Web3
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Callable, Tuple
+from requests.exceptions import Timeout as RequestTimeout
+from web3 import AsyncWeb3, Web3, WebsocketProviderV2
 from web3.contract import Contract
+from web3.exceptions import TimeExhausted
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 
-from backend.database.connection import get_db
+from backend.blockchain.smart_contract_manager import (
+    TOPIC_PROPOSAL_CREATED, TOPIC_PROPOSAL_SIGNED, TOPIC_PROPOSAL_EXECUTED
+)
+from backend.config import GANACHE_CONFIG
+from backend.database.connection import get_db_manager
 from backend.database.models import Proposal, ThreatDetectionLog, ExecutionLog
 
 logger = logging.getLogger(__name__)
@@ -25,8 +34,14 @@ class ContractEventListener:
         self.w3 = smart_contract_manager.w3
         self.contract = smart_contract_manager.contract
         self.is_listening = False
-        self.event_filters = {}
+        self.log_filter_params = None
+        self.event_handlers = {}  # topic0 -> (合约事件, 处理函数)
         self.latest_block = 0
+        self._next_block = 0  # 下一个待拉取事件日志的区块号
+        self._stride = GANACHE_CONFIG['log_batch_blocks']  # 当前eth_getLogs区块跨度
+        self._seen_logs = OrderedDict()  # 已处理日志的(txHash, logIndex)，节点重放/重组时跳过
+        self._subscription_task = None  # WebSocket事件订阅任务
+        self._proposal_ids = OrderedDict()  # contract_proposal_id -> Proposal.id（LRU）
         
     async def start_listening(self):
         """开始监听合约事件"""
@@ -35,79 +50,182 @@ class ContractEventListener:
             return
         
         self.is_listening = True
-        self.latest_block = self.w3.eth.block_number
+        self.latest_block = await asyncio.to_thread(lambda: self.w3.eth.block_number)
+        self._next_block = self.latest_block
         
-        logger.info(f"🎧 开始监听智能合约事件，起始区块: {self.latest_block}")
+        logger.info("🎧 开始监听智能合约事件，起始区块: %s", self.latest_block)
         
         # 创建事件过滤器
         self._create_event_filters()
         
+        # 优先使用WebSocket订阅，由节点推送事件日志
+        ws_url = GANACHE_CONFIG.get('ws_url')
+        if ws_url:
+            self._subscription_task = asyncio.ensure_future(self._subscription_loop(ws_url))
+            try:
+                await self._subscription_task
+            except asyncio.CancelledError:
+                if not self.is_listening:
+                    return
+                raise
+            except Exception as e:
+                logger.warning("⚠️ WebSocket事件订阅不可用，回退为轮询模式: %s", e)
+            finally:
+                self._subscription_task = None
+        
         # 启动事件监听循环
         await self._event_listening_loop()
     
     def stop_listening(self):
         """停止监听合约事件"""
         self.is_listening = False
+        if self._subscription_task is not None:
+            self._subscription_task.cancel()
         logger.info("🛑 停止监听智能合约事件")
     
     def _create_event_filters(self):
-        """创建事件过滤器"""
+        """创建事件过滤器
+        
+        三种提案事件共用一组按合约地址过滤的日志条件（topic0取任一事件签名），
+        每个区块区间只需一次eth_getLogs请求，再按topic0分派到对应处理函数
+        """
         try:
-            # ProposalCreated事件过滤器
-            self.event_filters['ProposalCreated'] = self.contract.events.ProposalCreated.create_filter(
-                fromBlock=self.latest_block
-            )
+            self.event_handlers = {
+                TOPIC_PROPOSAL_CREATED: (self.contract_manager.proposal_created_event, self._handle_proposal_created),
+                TOPIC_PROPOSAL_SIGNED: (self.contract_manager.proposal_signed_event, self._handle_proposal_signed),
+                TOPIC_PROPOSAL_EXECUTED: (self.contract_manager.proposal_executed_event, self._handle_proposal_executed),
+            }
             
-            # ProposalSigned事件过滤器  
-            self.event_filters['ProposalSigned'] = self.contract.events.ProposalSigned.create_filter(
-                fromBlock=self.latest_block
-            )
-            
-            # ProposalExecuted事件过滤器
-            self.event_filters['ProposalExecuted'] = self.contract.events.ProposalExecuted.create_filter(
-                fromBlock=self.latest_block
-            )
+            self.log_filter_params = {
+                "address": self.contract.address,
+                "topics": [[Web3.to_hex(topic) for topic in self.event_handlers]],
+            }
             
             logger.info("✅ 智能合约事件过滤器创建成功")
             
         except Exception as e:
-            logger.error(f"❌ 创建事件过滤器失败: {e}")
+            logger.error("❌ 创建事件过滤器失败: %s", e)
             raise
     
+    async def _subscription_loop(self, ws_url: str):
+        """通过WebSocket eth_subscribe("logs")接收合约事件
+        
+        订阅建立后先补拉订阅前的区块，之后由节点逐条推送，空闲时没有任何RPC请求；
+        补拉与推送重叠或断线重连时重复的日志按(txHash, logIndex)去重。
+        推送的日志同步失败时不再前移_next_block，收到下一条推送时从该处重新补拉。
+        连接断开时抛出异常，由调用方回退到轮询模式从_next_block继续补拉
+        """
+        async with AsyncWeb3.persistent_websocket(WebsocketProviderV2(ws_url)) as ws_w3:
+            await ws_w3.eth.subscribe("logs", self.log_filter_params)
+            logger.info("🔌 已通过WebSocket订阅智能合约事件: %s", ws_url)
+            
+            resync_needed = not await self._check_new_events(await ws_w3.eth.block_number)
+            
+            async for message in ws_w3.ws.process_subscriptions():
+                log = message['result']
+                if resync_needed:
+                    # 之前有日志未同步成功：从_next_block重新拉取到当前区块（已提交的日志按去重跳过）
+                    resync_needed = not await self._check_new_events(log['blockNumber'])
+                    continue
+                
+                if await self._apply_operations([self._dispatch_log(log)]) is None:
+                    # 同一区块的其余日志可能尚未推送，回退轮询时从该区块重新拉取
+                    self._next_block = max(self._next_block, log['blockNumber'])
+                else:
+                    resync_needed = True
+    
     async def _event_listening_loop(self):
         """事件监听主循环"""
         while self.is_listening:
             try:
-                # 检查新事件
-                await self._check_new_events()
+                # 只有出现新区块时才拉取事件日志（Ganache等按交易出块，空闲时无新日志）
+                current_block = await asyncio.to_thread(lambda: self.w3.eth.block_number)
+                if current_block >= self._next_block:
+                    await self._check_new_events(current_block)
                 
                 # 短暂休眠
                 await asyncio.sleep(2)
                 
             except Exception as e:
-                logger.error(f"❌ 事件监听循环错误: {e}")
+                logger.error("❌ 事件监听循环错误: %s", e)
                 await asyncio.sleep(5)  # 错误时延长休眠时间
     
-    async def _check_new_events(self):
-        """检查新事件"""
+    async def _check_new_events(self, latest_block: int) -> bool:
+        """按区块区间分段拉取并处理新事件，直到追上latest_block，返回是否已全部同步
+        
+        区间跨度自适应：请求超时则减半，快速成功则翻倍，
+        避免落后较多时单次eth_getLogs扫描过大区间而超时。
+        有日志同步失败时_next_block停在该日志所在区块，下一轮从这里重新拉取
+        """
         try:
-            # 检查ProposalCreated事件
-            for event in self.event_filters['ProposalCreated'].get_new_entries():
-                await self._handle_proposal_created(event)
-            
-            # 检查ProposalSigned事件
-            for event in self.event_filters['ProposalSigned'].get_new_entries():
-                await self._handle_proposal_signed(event)
-            
-            # 检查ProposalExecuted事件
-            for event in self.event_filters['ProposalExecuted'].get_new_entries():
-                await self._handle_proposal_executed(event)
+            while self._next_block <= latest_block:
+                to_block = min(self._next_block + self._stride - 1, latest_block)
+                params = dict(self.log_filter_params, fromBlock=self._next_block, toBlock=to_block)
+                
+                started = time.monotonic()
+                try:
+                    logs = await asyncio.to_thread(self.w3.eth.get_logs, params)
+                except (TimeExhausted, RequestTimeout, ValueError) as e:
+                    # 缩小跨度，下一轮从同一区块重试
+                    self._stride = max(self._stride // 2, GANACHE_CONFIG['log_batch_min_blocks'])
+                    logger.warning("⚠️ 拉取事件日志超时（区块 %s-%s），跨度调整为 %s: %s", self._next_block, to_block, self._stride, e)
+                    return False
+                
+                if time.monotonic() - started < GANACHE_CONFIG['log_batch_fast_seconds']:
+                    self._stride = min(self._stride * 2, GANACHE_CONFIG['log_batch_max_blocks'])
+                
+                # 同一区间内的所有事件在一个数据库事务中同步
+                failed_block = await self._apply_operations(map(self._dispatch_log, logs))
+                if failed_block is not None:
+                    self._next_block = failed_block
+                    return False
+                
+                self._next_block = to_block + 1
+            return True
                 
         except Exception as e:
-            logger.error(f"❌ 检查新事件失败: {e}")
+            logger.error("❌ 检查新事件失败: %s", e)
+            return False
     
-    async def _handle_proposal_created(self, event):
-        """处理ProposalCreated事件"""
+    def _dispatch_log(self, log) -> Optional[Tuple[Tuple, int, Optional[Callable[[Session], None]]]]:
+        """跳过已处理的日志，按topic0分派给对应的事件处理函数，返回(去重键, 区块号, 待执行的数据库操作)"""
+        key = (log['transactionHash'], log['logIndex'])  # HexBytes按bytes哈希，无需复制
+        if key in self._seen_logs:
+            self._seen_logs.move_to_end(key)
+            return None
+        event, handler = self.event_handlers.get(log['topics'][0], (None, None))
+        if handler is None:
+            return None
+        return key, log['blockNumber'], handler(event.process_log(log))
+    
+    async def _apply_operations(self, dispatched) -> Optional[int]:
+        """在工作线程中执行一批数据库同步操作（不阻塞事件循环）
+        
+        只有提交成功的日志才记为已处理；返回未提交日志中最小的区块号，全部提交时返回None，
+        由调用方将_next_block停在该区块，重新拉取时已提交的日志按去重跳过
+        """
+        dispatched = [item for item in dispatched if item is not None and item[2] is not None]
+        if not dispatched:
+            return None
+        committed = await asyncio.to_thread(
+            self._run_in_session, *(operation for _, _, operation in dispatched)
+        )
+        failed_block = None
+        for (key, block_number, _), succeeded in zip(dispatched, committed):
+            if succeeded:
+                self._mark_log_seen(key)
+            elif failed_block is None or block_number < failed_block:
+                failed_block = block_number
+        return failed_block
+    
+    def _mark_log_seen(self, key: Tuple):
+        """记录日志已处理（按LRU保留最近的记录）"""
+        self._seen_logs[key] = None
+        if len(self._seen_logs) > GANACHE_CONFIG['log_dedup_size']:
+            self._seen_logs.popitem(last=False)
+    
+    def _handle_proposal_created(self, event) -> Optional[Callable[[Session], None]]:
+        """处理ProposalCreated事件，返回同步到数据库的操作"""
         try:
             args = event['args']
             proposal_id = args['proposalId']
@@ -115,33 +233,31 @@ class ContractEventListener:
             target = args['target']
             amount = args['amount']
             
-            logger.info(f"📝 检测到新提案创建事件: ID-{proposal_id}, 创建者-{creator}")
+            logger.info("📝 检测到新提案创建事件: ID-%s, 创建者-%s", proposal_id, creator)
             
-            # 同步到数据库
-            with next(get_db()) as db:
-                await self._sync_proposal_to_db(db, proposal_id, 'created')
+            return lambda db: self._sync_proposal_to_db(db, proposal_id, 'created')
             
         except Exception as e:
-            logger.error(f"❌ 处理ProposalCreated事件失败: {e}")
+            logger.error("❌ 处理ProposalCreated事件失败: %s", e)
+            return None
     
-    async def _handle_proposal_signed(self, event):
-        """处理ProposalSigned事件"""
+    def _handle_proposal_signed(self, event) -> Optional[Callable[[Session], None]]:
+        """处理ProposalSigned事件，返回同步到数据库的操作"""
         try:
             args = event['args']
             proposal_id = args['proposalId']
             signer = args['signer']
             
-            logger.info(f"✅ 检测到提案签名事件: ID-{proposal_id}, 签名者-{signer}")
+            logger.info("✅ 检测到提案签名事件: ID-%s, 签名者-%s", proposal_id, signer)
             
-            # 同步到数据库
-            with next(get_db()) as db:
-                await self._sync_proposal_to_db(db, proposal_id, 'signed', signer)
+            return lambda db: self._sync_proposal_to_db(db, proposal_id, 'signed', signer)
             
         except Exception as e:
-            logger.error(f"❌ 处理ProposalSigned事件失败: {e}")
+            logger.error("❌ 处理ProposalSigned事件失败: %s", e)
+            return None
     
-    async def _handle_proposal_executed(self, event):
-        """处理ProposalExecuted事件"""
+    def _handle_proposal_executed(self, event) -> Optional[Callable[[Session], None]]:
+        """处理ProposalExecuted事件，返回同步到数据库的操作"""
         try:
             args = event['args']
             proposal_id = args['proposalId']
@@ -149,118 +265,143 @@ class ContractEventListener:
             target = args['target']
             amount = args['amount']
             
-            logger.info(f"🎉 检测到提案执行事件: ID-{proposal_id}, 执行者-{executor}")
+            logger.info("🎉 检测到提案执行事件: ID-%s, 执行者-%s", proposal_id, executor)
             
-            # 同步到数据库
-            with next(get_db()) as db:
-                await self._sync_proposal_to_db(db, proposal_id, 'executed', executor)
-                await self._create_execution_log(db, proposal_id, executor, target, amount)
+            return lambda db: self._apply_executed_event(db, proposal_id, executor, target, amount)
             
         except Exception as e:
-            logger.error(f"❌ 处理ProposalExecuted事件失败: {e}")
+            logger.error("❌ 处理ProposalExecuted事件失败: %s", e)
+            return None
     
-    async def _sync_proposal_to_db(self, db: Session, contract_proposal_id: int, 
-                                  action: str, actor: str = None):
-        """同步提案状态到数据库"""
+    def _run_in_session(self, *operations: Callable[[Session], None]) -> List[bool]:
+        """在同一个数据库事务中依次执行同步操作（由工作线程调用），返回每个操作是否已提交
+        
+        一批事件只提交一次；任一操作失败时整批回滚，再逐个操作单独提交，
+        避免一条异常事件导致同批其他事件丢失
+        """
+        db_manager = get_db_manager()
         try:
-            # 查找对应的数据库提案
-            proposal = db.query(Proposal).filter(
-                Proposal.contract_proposal_id == contract_proposal_id
-            ).first()
-            
-            if not proposal:
-                logger.warning(f"⚠️ 未找到合约提案ID {contract_proposal_id} 对应的数据库记录")
-                return
-            
-            # 从合约获取最新状态
-            contract_proposal = self.contract_manager.get_proposal(contract_proposal_id)
-            if not contract_proposal:
-                logger.error(f"❌ 无法从合约获取提案 {contract_proposal_id} 的信息")
-                return
-            
-            # 更新数据库状态
-            if action == 'created':
-                proposal.status = 'pending'
-                proposal.contract_address = self.contract_manager.contract_address
-                
-            elif action == 'signed':
-                # 更新签名信息
-                signed_by = proposal.signed_by or []
-                
-                # 将地址转换为角色名（需要映射逻辑）
-                signer_role = self._address_to_role(actor)
-                if signer_role and signer_role not in signed_by:
-                    signed_by.append(signer_role)
-                    proposal.signed_by = signed_by
-                    proposal.signatures_count = len(signed_by)
-                
-            elif action == 'executed':
-                proposal.status = 'executed'
-                proposal.approved_at = datetime.now()
-                
-                # 记录执行者
-                executor_role = self._address_to_role(actor)
-                if executor_role:
-                    proposal.final_signer = executor_role
-            
-            db.commit()
-            logger.info(f"✅ 数据库提案同步成功: DB-ID-{proposal.id}, Contract-ID-{contract_proposal_id}, Action-{action}")
-            
+            with db_manager.session_scope() as db:
+                for operation in operations:
+                    operation(db)
+            return [True] * len(operations)
         except Exception as e:
-            logger.error(f"❌ 同步提案到数据库失败: {e}")
-            db.rollback()
+            if len(operations) == 1:
+                logger.error("❌ 事件同步失败: %s", e)
+                return [False]
+            logger.warning("⚠️ 批量事件同步失败，逐条重试: %s", e)
+        
+        committed = []
+        for operation in operations:
+            try:
+                with db_manager.session_scope() as db:
+                    operation(db)
+                committed.append(True)
+            except Exception as e:
+                logger.error("❌ 事件同步失败: %s", e)
+                committed.append(False)
+        return committed
     
-    async def _create_execution_log(self, db: Session, contract_proposal_id: int,
-                                   executor: str, target: str, amount: int):
-        """创建执行日志"""
-        try:
-            # 查找对应的提案
-            proposal = db.query(Proposal).filter(
-                Proposal.contract_proposal_id == contract_proposal_id
-            ).first()
-            
-            if not proposal:
-                logger.warning(f"⚠️ 创建执行日志时未找到提案: Contract-ID-{contract_proposal_id}")
-                return
-            
-            # 创建执行日志
-            execution_log = ExecutionLog(
-                proposal_id=proposal.id,
-                action_type="blockchain_reward",
-                target_ip=proposal.target_ip or "N/A",
-                success=True,
-                response_data={
-                    "contract_proposal_id": contract_proposal_id,
-                    "executor": executor,
-                    "target": target,
-                    "amount_wei": amount,
-                    "amount_eth": self.w3.from_wei(amount, 'ether'),
-                    "action": "智能合约自动执行奖励发放"
-                }
+    def _resolve_proposal_id(self, db: Session, contract_proposal_id: int) -> Optional[int]:
+        """查找合约提案对应的数据库提案主键
+        
+        事件由合约发出，提案必然存在于链上，且状态变化所需信息（签名者/执行者/金额）
+        都在事件参数中，无需再通过eth_call读取合约提案。
+        同一提案的创建/签名/执行事件接连到达，映射结果按LRU缓存，后续更新直接按主键进行
+        """
+        proposal_id = self._proposal_ids.get(contract_proposal_id)
+        if proposal_id is not None:
+            self._proposal_ids.move_to_end(contract_proposal_id)
+            return proposal_id
+        
+        proposal_id = db.execute(
+            select(Proposal.id).where(Proposal.contract_proposal_id == contract_proposal_id)
+        ).scalar()
+        
+        if proposal_id is None:
+            logger.warning("⚠️ 未找到合约提案ID %s 对应的数据库记录", contract_proposal_id)
+            return None
+        
+        self._proposal_ids[contract_proposal_id] = proposal_id
+        if len(self._proposal_ids) > GANACHE_CONFIG['proposal_id_cache_size']:
+            self._proposal_ids.popitem(last=False)
+        return proposal_id
+    
+    def _sync_proposal_to_db(self, db: Session, contract_proposal_id: int, 
+                             action: str, actor: str = None):
+        """同步提案状态到数据库（created/signed事件），由调用方统一提交"""
+        proposal_db_id = self._resolve_proposal_id(db, contract_proposal_id)
+        if proposal_db_id is None:
+            return
+        
+        # 更新数据库状态
+        if action == 'created':
+            db.execute(
+                update(Proposal)
+                .where(Proposal.id == proposal_db_id)
+                .values(status='pending', contract_address=self.contract_manager.contract_address)
             )
             
-            db.add(execution_log)
-            db.commit()
-            
-            logger.info(f"✅ 执行日志创建成功: Contract-ID-{contract_proposal_id}")
-            
-        except Exception as e:
-            logger.error(f"❌ 创建执行日志失败: {e}")
-            db.rollback()
+        elif action == 'signed':
+            # 将地址转换为角色名（需要映射逻辑）
+            signer_role = self._address_to_role(actor)
+            if signer_role:
+                # 服务端原子追加签名信息，已签名时不做修改
+                db.execute(Proposal.append_signer_stmt(db.get_bind().dialect.name, proposal_db_id, signer_role))
+        
+        logger.info("✅ 数据库提案同步成功: DB-ID-%s, Contract-ID-%s, Action-%s", proposal_db_id, contract_proposal_id, action)
+    
+    def _apply_executed_event(self, db: Session, contract_proposal_id: int,
+                              executor: str, target: str, amount: int):
+        """处理提案执行：按主键更新状态并写入执行日志（与同批事件在同一事务中提交）"""
+        proposal_db_id = self._resolve_proposal_id(db, contract_proposal_id)
+        if proposal_db_id is None:
+            return
+        
+        updated = db.execute(
+            update(Proposal)
+            .where(Proposal.id == proposal_db_id)
+            .values(status='executed', approved_at=func.now())
+            .returning(Proposal.target_ip)
+        ).first()
+        if updated is None:
+            # 缓存的提案已被删除
+            self._proposal_ids.pop(contract_proposal_id, None)
+            logger.warning("⚠️ 未找到合约提案ID %s 对应的数据库记录", contract_proposal_id)
+            return
+        
+        # 创建执行日志（执行者记录在manager_account中）
+        db.add(ExecutionLog(
+            proposal_id=proposal_db_id,
+            action_type="blockchain_reward",
+            target_ip=updated.target_ip or "N/A",
+            execution_status="success",
+            execution_details="智能合约自动执行奖励发放",
+            manager_account=executor,
+            execution_data={
+                "contract_proposal_id": contract_proposal_id,
+                "executor": executor,
+                "target": target,
+                "amount_wei": amount,
+                "amount_eth": float(self.w3.from_wei(amount, 'ether')),
+                "action": "智能合约自动执行奖励发放"
+            }
+        ))
+
+        logger.info("✅ 提案执行同步成功: DB-ID-%s, Contract-ID-%s", proposal_db_id, contract_proposal_id)
     
     def _address_to_role(self, address: str) -> Optional[str]:
         """将以太坊地址转换为角色名"""
         try:
-            # 遍历web3_manager的账户映射
-            for role, addr in self.contract_manager.web3_manager.accounts.items():
-                if addr.lower() == address.lower():
-                    return role
+            role = self.contract_manager.web3_manager.get_role_by_address(address)
+            if role is not None:
+                return role
             
-            logger.warning(f"⚠️ 未找到地址 {address} 对应的角色")
+            logger.warning("⚠️ 未找到地址 %s 对应的角色", address)
             return None
             
         except Exception as e:
-            logger.error(f"❌ 地址到角色转换失败: {e}")
+            logger.error("❌ 地址到角色转换失败: %s", e)
             return None
 
 class ContractSyncService:
@@ -293,38 +434,50 @@ class ContractSyncService:
             # 获取所有合约提案
             contract_proposals = self.contract_manager.get_all_proposals()
             
-            with next(get_db()) as db:
-                for contract_proposal in contract_proposals:
-                    await self._ensure_proposal_in_db(db, contract_proposal)
+            with get_db_manager().session_scope() as db:
+                self._sync_proposals_to_db(db, contract_proposals)
             
-            logger.info(f"✅ 历史数据同步完成，共处理 {len(contract_proposals)} 个提案")
+            logger.info("✅ 历史数据同步完成，共处理 %s 个提案", len(contract_proposals))
             
         except Exception as e:
-            logger.error(f"❌ 历史数据同步失败: {e}")
+            logger.error("❌ 历史数据同步失败: %s", e)
     
-    async def _ensure_proposal_in_db(self, db: Session, contract_proposal: Dict):
-        """确保合约提案在数据库中存在"""
+    def _sync_proposals_to_db(self, db: Session, contract_proposals: List[Dict]):
+        """批量同步合约提案状态：一次查询已有记录，按主键批量更新后统一提交"""
         try:
-            contract_id = contract_proposal['id']
-            
-            # 检查是否已存在
-            existing = db.query(Proposal).filter(
-                Proposal.contract_proposal_id == contract_id
-            ).first()
-            
-            if existing:
-                # 更新状态
-                if contract_proposal['executed'] and existing.status != 'executed':
-                    existing.status = 'executed'
-                    existing.approved_at = datetime.fromtimestamp(contract_proposal['created_at'])
-                    db.commit()
-                    logger.info(f"✅ 更新提案状态: DB-ID-{existing.id}, Contract-ID-{contract_id}")
-            else:
-                logger.info(f"⚠️ 发现孤立的合约提案: Contract-ID-{contract_id}")
-                # 可以选择创建占位符记录或记录警告
+            contract_ids = [contract_proposal['id'] for contract_proposal in contract_proposals]
+            existing = {
+                row.contract_proposal_id: row
+                for row in db.execute(
+                    select(Proposal.id, Proposal.contract_proposal_id, Proposal.status)
+                    .where(Proposal.contract_proposal_id.in_(contract_ids))
+                )
+            }
+            
+            updates = []
+            for contract_proposal in contract_proposals:
+                contract_id = contract_proposal['id']
+                row = existing.get(contract_id)
+                if row is None:
+                    logger.info("⚠️ 发现孤立的合约提案: Contract-ID-%s", contract_id)
+                    # 可以选择创建占位符记录或记录警告
+                elif contract_proposal['executed'] and row.status != 'executed':
+                    updates.append({
+                        "id": row.id,
+                        "status": "executed",
+                        "approved_at": datetime.fromtimestamp(
+                            contract_proposal['created_at'], timezone.utc
+                        ).replace(tzinfo=None)
+                    })
+            
+            if updates:
+                db.execute(update(Proposal), updates)
+                db.commit()
+                logger.info("✅ 更新提案状态: %s 个提案标记为已执行", len(updates))
                 
         except Exception as e:
-            logger.error(f"❌ 处理合约提案失败: {e}")
+            logger.error("❌ 批量同步合约提案失败: %s", e)
+            db.rollback()
 
 # 全局同步服务实例
 _sync_service = None
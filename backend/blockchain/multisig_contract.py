@@ -3,28 +3,118 @@ MultiSig Contract Integration Module - Python Version
 Integrates custom multi-signature contract with existing Web3Manager
 """
 
-import json
 import os
-from datetime import datetime
-from typing import Dict, Any, Set
+import threading
+from collections import OrderedDict
+from bisect import bisect_left
+from dataclasses import dataclass
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Set, Tuple
 import logging
 
+import orjson
+from web3 import Web3
+
+from backend.config import INCENTIVE_CONFIG
+
 logger = logging.getLogger(__name__)
 
+# JSON资产解析缓存：路径 -> (修改时间ns, 内容)，文件未变化时重复实例化不再读取解析
+_JSON_FILE_CACHE: Dict[str, Tuple[int, Any]] = {}
+
+# 角色权限集合（签名/创建提案时O(1)校验）
+_AUTHORIZED_SIGNERS = frozenset({"manager_0", "manager_1", "manager_2"})
+_AUTHORIZED_CREATORS = frozenset({"operator_0", "operator_1", "operator_2", "operator_3", "operator_4"}) | _AUTHORIZED_SIGNERS
+
+# 基础奖励 0.01 ETH（wei值导入时换算一次）
+_BASE_REWARD_ETH = 0.01
+_BASE_REWARD_WEI = Web3.to_wei(_BASE_REWARD_ETH, 'ether')
+
+@dataclass
+class MultiSigProposalRecord:
+    """内存中的多签名提案（槽位存储；签名以owner下标位掩码记录）"""
+    __slots__ = ("id", "target", "amount", "amount_wei", "data", "creator", "creator_role",
+                 "created_at_ns", "executed", "signature_count", "signature_mask",
+                 "executed_at_ns", "executor_role", "execution_tx_hash")
+    
+    id: int
+    target: str
+    amount: float
+    amount_wei: int
+    data: str
+    creator: str
+    creator_role: Optional[str]
+    created_at_ns: int  # time.time_ns()，仅在序列化时格式化
+    executed: bool
+    signature_count: int
+    signature_mask: int  # 第i位表示config["owners"][i]已签名
+    executed_at_ns: Optional[int]
+    executor_role: Optional[str]
+    execution_tx_hash: Optional[str]
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+# 质量评分分段：bisect_left(阈值, x)即为x所在档位（x<=阈值时落入该档）
+_SPEED_THRESHOLDS = (10, 30, 60, 120, 300)  # 响应时间（秒）
+_SPEED_SCORES = (60, 50, 40, 30, 20, 10)
+_ACTIVITY_THRESHOLDS = (10 * _NS_PER_MINUTE, 30 * _NS_PER_MINUTE, 60 * _NS_PER_MINUTE)  # 距上次签名（纳秒）
+_ACTIVITY_SCORES = (40, 30, 20, 10)
+
+def _format_ns(timestamp_ns: Optional[int]) -> Optional[str]:
+    """将time.time_ns()时间戳格式化为带UTC偏移的ISO字符串"""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).isoformat()
+
+def _write_state_file(path: str, state: Dict[str, Any], option: int = 0):
+    """原子地写入JSON状态文件（先写临时文件再替换，避免中途失败留下半个文件）"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(state, option=option))
+    os.replace(tmp_path, path)
+
+def _load_json_file(path: str) -> Any:
+    """读取并解析JSON文件（按修改时间缓存），文件不存在时返回None
+    
+    返回的是缓存中的共享对象，调用方需要修改时应自行复制
+    """
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _JSON_FILE_CACHE.get(path)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    with open(path, 'rb') as f:
+        value = orjson.loads(f.read())
+    _JSON_FILE_CACHE[path] = (mtime_ns, value)
+    return value
+
 class MultiSigContract:
     """多签名合约集成类"""
     
     def __init__(self, web3_manager):
         self.web3_manager = web3_manager
-        self.proposals = {}  # In-memory proposal storage for demo
+        self.proposals: Dict[int, MultiSigProposalRecord] = {}  # In-memory proposal storage for demo
+        self._pending_proposals: Dict[int, MultiSigProposalRecord] = {}  # 未执行提案索引（保持创建顺序）
+        self._recent_executed: "OrderedDict[int, MultiSigProposalRecord]" = OrderedDict()  # 最近执行的提案（按执行顺序）
+        self._archive_path = str(INCENTIVE_CONFIG["multisig_archive_file"])
+        self._archive_offsets: Dict[int, int] = {}  # 已归档提案ID -> 归档文件中的字节偏移
         self.proposal_counter = 1
         
         # Reward pool state (simulated)
         self.reward_pool_balance = 0.0  # ETH
         self.contributions = {}  # manager_address -> contribution_data
+        self._contributions_pending = 0  # 尚未写入状态文件的贡献度更新次数
+        self._pool_dirty = False  # 奖金池余额是否有尚未写入状态文件的变更
+        self._state_flushed_at = time.monotonic()
+        self._state_flush_timer: Optional[threading.Timer] = None  # 到期后强制写入待保存状态的定时器
+        self._state_flush_lock = threading.Lock()
         
         # Load contract configuration
         self.config = self._load_config()
+        self._owner_index = self._build_owner_index(self.config["owners"])
         
         # Initialize reward pool balance from persistent storage or Treasury tracking
         self._initialize_reward_pool_balance()
@@ -36,8 +126,9 @@ class MultiSigContract:
         """加载合约配置"""
         try:
             config_path = os.path.join(os.path.dirname(__file__), '../assets/multisig_contract.json')
-            with open(config_path, 'r') as f:
-                config = json.load(f)
+            config = _load_json_file(config_path)
+            if config is None:
+                raise FileNotFoundError(config_path)
             logger.info(f"✅ MultiSig合约配置加载成功: {config['address']}")
             return config
         except Exception as e:
@@ -55,6 +146,20 @@ class MultiSigContract:
                 "chainId": 1337
             }
     
+    @staticmethod
+    def _build_owner_index(owners: List[str]) -> Dict[str, int]:
+        """owner地址 -> 在owners中的下标（同时以原格式和小写为键，签名校验与位掩码共用）"""
+        owner_index = {}
+        for index, owner in enumerate(owners):
+            owner_index.setdefault(owner, index)
+            owner_index.setdefault(owner.lower(), index)
+        return owner_index
+    
+    def _get_owner_index(self, address: str) -> Optional[int]:
+        """获取地址在owners中的下标，非owner返回None"""
+        index = self._owner_index.get(address)
+        return index if index is not None else self._owner_index.get(address.lower())
+    
     def create_proposal(self, target: str, amount: float, data: str = "0x", creator_role: str = None) -> Dict[str, Any]:
         """创建多签名提案 - 现在检查角色权限"""
         try:
@@ -68,24 +173,27 @@ class MultiSigContract:
             
             amount_wei = self.web3_manager.w3.to_wei(amount, 'ether')
             
-            proposal = {
-                "id": proposal_id,
-                "target": target,
-                "amount": amount,
-                "amount_wei": amount_wei,
-                "data": data,
-                "executed": False,
-                "signature_count": 0,
-                "signatures": set(),
-                "creator": self.web3_manager.accounts.get(creator_role or 'treasury', 'unknown'),
-                "creator_role": creator_role,
-                "created_at": datetime.now().isoformat(),
-                "contract_address": self.config["address"]
-            }
+            proposal = MultiSigProposalRecord(
+                id=proposal_id,
+                target=target,
+                amount=amount,
+                amount_wei=amount_wei,
+                data=data,
+                creator=self.web3_manager.accounts.get(creator_role or 'treasury', 'unknown'),
+                creator_role=creator_role,
+                created_at_ns=time.time_ns(),
+                executed=False,
+                signature_count=0,
+                signature_mask=0,
+                executed_at_ns=None,
+                executor_role=None,
+                execution_tx_hash=None
+            )
             
             self.proposals[proposal_id] = proposal
+            self._pending_proposals[proposal_id] = proposal
             
-            logger.info(f"📝 MultiSig提案创建: ID-{proposal_id}, Target-{target}, Amount-{amount} ETH, Creator-{creator_role}")
+            logger.info("📝 MultiSig提案创建: ID-%s, Target-%s, Amount-%s ETH, Creator-%s", proposal_id, target, amount, creator_role)
             
             return {
                 "success": True,
@@ -113,44 +221,47 @@ class MultiSigContract:
             if not self.is_authorized_signer(signer_role):
                 raise ValueError(f"Role {signer_role} is not authorized to sign proposals")
             
-            proposal = self.proposals.get(proposal_id)
+            proposal = self._get_record(proposal_id)
             if not proposal:
                 raise ValueError(f"Proposal {proposal_id} not found")
             
-            if proposal["executed"]:
+            if proposal.executed:
                 raise ValueError(f"Proposal {proposal_id} already executed")
             
             signer_address = self.web3_manager.accounts.get(signer_role)
             if not signer_address:
                 raise ValueError(f"Unknown signer role: {signer_role}")
             
-            if signer_address not in self.config["owners"]:
+            owner_index = self._get_owner_index(signer_address)
+            if owner_index is None:
                 raise ValueError(f"{signer_role} is not an authorized signer")
             
-            if signer_role in proposal["signatures"]:
+            signer_bit = 1 << owner_index
+            if proposal.signature_mask & signer_bit:
                 raise ValueError(f"{signer_role} has already signed this proposal")
             
             # 添加签名
-            proposal["signatures"].add(signer_role)
-            proposal["signature_count"] += 1
+            proposal.signature_mask |= signer_bit
+            proposal.signature_count += 1
             
             # 更新贡献记录
-            self._update_contribution(signer_role, proposal["created_at"])
+            signed_at_ns = time.time_ns()
+            self._update_contribution(signer_role, proposal.created_at_ns, signed_at_ns)
             
-            logger.info(f"✅ Proposal {proposal_id} signed by {signer_role} ({proposal['signature_count']}/{self.config['threshold']})")
+            logger.info("✅ Proposal %s signed by %s (%s/%s)", proposal_id, signer_role, proposal.signature_count, self.config['threshold'])
             
             result = {
                 "success": True,
                 "proposal_id": proposal_id,
                 "signer": signer_address,
                 "signer_role": signer_role,
-                "signature_count": proposal["signature_count"],
+                "signature_count": proposal.signature_count,
                 "required_signatures": self.config["threshold"],
-                "signed_at": datetime.now().isoformat()
+                "signed_at": _format_ns(signed_at_ns)
             }
             
             # 检查是否达到阈值，自动执行
-            if proposal["signature_count"] >= self.config["threshold"]:
+            if proposal.signature_count >= self.config["threshold"]:
                 execution_result = self._execute_proposal(proposal_id, signer_role)
                 result["executed"] = True
                 result["execution_result"] = execution_result
@@ -171,34 +282,36 @@ class MultiSigContract:
         try:
             proposal = self.proposals.get(proposal_id)
             
-            if proposal["signature_count"] < self.config["threshold"]:
-                raise ValueError(f"Insufficient signatures: {proposal['signature_count']}/{self.config['threshold']}")
+            if proposal.signature_count < self.config["threshold"]:
+                raise ValueError(f"Insufficient signatures: {proposal.signature_count}/{self.config['threshold']}")
             
             # 使用现有的Web3Manager发送奖励
             reward_result = self.web3_manager.send_reward(
                 'treasury', 
                 executor_role, 
-                proposal["amount"]
+                proposal.amount
             )
             
             if reward_result["success"]:
-                proposal["executed"] = True
-                proposal["executed_at"] = datetime.now().isoformat()
-                proposal["executor_role"] = executor_role
-                proposal["execution_tx_hash"] = reward_result["tx_hash"]
+                proposal.executed = True
+                proposal.executed_at_ns = time.time_ns()
+                proposal.executor_role = executor_role
+                proposal.execution_tx_hash = reward_result["tx_hash"]
+                self._pending_proposals.pop(proposal_id, None)
+                self._archive_executed(proposal)
                 
-                logger.info(f"🎉 Proposal {proposal_id} executed successfully! Reward sent to {executor_role}")
+                logger.info("🎉 Proposal %s executed successfully! Reward sent to %s", proposal_id, executor_role)
                 
                 return {
                     "success": True,
                     "proposal_id": proposal_id,
                     "executor": executor_role,
-                    "target": proposal["target"],
-                    "amount": proposal["amount"],
+                    "target": proposal.target,
+                    "amount": proposal.amount,
                     "tx_hash": reward_result["tx_hash"],
                     "gas_used": reward_result["gas_used"],
                     "block_number": reward_result["block_number"],
-                    "executed_at": proposal["executed_at"]
+                    "executed_at": _format_ns(proposal.executed_at_ns)
                 }
             else:
                 raise Exception(f"Reward transfer failed: {reward_result['error']}")
@@ -213,34 +326,44 @@ class MultiSigContract:
     
     def get_proposal(self, proposal_id: int) -> Dict[str, Any]:
         """获取提案详情"""
-        proposal = self.proposals.get(proposal_id)
+        proposal = self._get_record(proposal_id)
         if not proposal:
             return None
-        
-        # 将set转换为list以便JSON序列化
-        signatures_list = list(proposal["signatures"])
+        return self._proposal_to_dict(proposal)
+    
+    def _proposal_to_dict(self, proposal: MultiSigProposalRecord) -> Dict[str, Any]:
+        """将提案记录转换为字典（签名位掩码展开为签名者角色列表）"""
+        owners = self.config["owners"]
+        signatures_list = [
+            self.web3_manager.get_role_by_address(owners[index])
+            for index in range(len(owners)) if proposal.signature_mask >> index & 1
+        ]
         
         return {
-            "id": proposal["id"],
-            "target": proposal["target"],
-            "amount": proposal["amount"],
-            "amount_wei": proposal["amount_wei"],
-            "executed": proposal["executed"],
-            "signature_count": proposal["signature_count"],
+            "id": proposal.id,
+            "target": proposal.target,
+            "amount": proposal.amount,
+            "amount_wei": proposal.amount_wei,
+            "executed": proposal.executed,
+            "signature_count": proposal.signature_count,
             "required_signatures": self.config["threshold"],
-            "creator": proposal["creator"],
-            "created_at": proposal["created_at"],
-            "executed_at": proposal.get("executed_at"),
-            "executor_role": proposal.get("executor_role"),
-            "execution_tx_hash": proposal.get("execution_tx_hash"),
+            "creator": proposal.creator,
+            "created_at": _format_ns(proposal.created_at_ns),
+            "executed_at": _format_ns(proposal.executed_at_ns),
+            "executor_role": proposal.executor_role,
+            "execution_tx_hash": proposal.execution_tx_hash,
             "contract_address": self.config["address"],
             "signatures": signatures_list
         }
     
     def has_signed(self, proposal_id: int, signer_role: str) -> bool:
         """检查签名者是否已签名"""
-        proposal = self.proposals.get(proposal_id)
-        return proposal and signer_role in proposal["signatures"]
+        proposal = self._get_record(proposal_id)
+        signer_address = self.web3_manager.accounts.get(signer_role)
+        owner_index = self._get_owner_index(signer_address) if signer_address else None
+        if not proposal or owner_index is None:
+            return False
+        return bool(proposal.signature_mask >> owner_index & 1)
     
     def get_contract_info(self) -> Dict[str, Any]:
         """获取合约信息"""
@@ -254,21 +377,81 @@ class MultiSigContract:
             "total_proposals": self.proposal_counter - 1
         }
     
-    def get_all_proposals(self) -> list:
-        """获取所有提案"""
-        return [self.get_proposal(proposal_id) for proposal_id in self.proposals.keys()]
+    def get_all_proposals(self, offset: int = 0, limit: Optional[int] = None) -> list:
+        """获取所有提案（包括已归档的提案，按ID排序）
+        
+        默认返回全部提案；传入limit时按内存中的ID索引分页，
+        已归档的提案按偏移量逐条读取，不扫描整个归档文件
+        """
+        all_ids = sorted([*self.proposals, *self._archive_offsets])
+        page_ids = all_ids[offset:] if limit is None else all_ids[offset:offset + limit]
+        
+        records = []
+        archive = None
+        try:
+            for proposal_id in page_ids:
+                proposal = self.proposals.get(proposal_id)
+                if proposal is None:
+                    if archive is None:
+                        archive = open(self._archive_path, 'rb')
+                    archive.seek(self._archive_offsets[proposal_id])
+                    proposal = MultiSigProposalRecord(**orjson.loads(archive.readline()))
+                records.append(proposal)
+        finally:
+            if archive is not None:
+                archive.close()
+        return [self._proposal_to_dict(proposal) for proposal in records]
+    
+    def _get_record(self, proposal_id: int) -> Optional[MultiSigProposalRecord]:
+        """按ID获取提案记录，内存中没有时从归档文件读取"""
+        proposal = self.proposals.get(proposal_id)
+        if proposal is not None:
+            return proposal
+        
+        offset = self._archive_offsets.get(proposal_id)
+        if offset is None:
+            return None
+        with open(self._archive_path, 'rb') as f:
+            f.seek(offset)
+            return MultiSigProposalRecord(**orjson.loads(f.readline()))
+    
+    def _archive_executed(self, proposal: MultiSigProposalRecord):
+        """已执行提案进入最近执行队列，超出容量时最早执行的提案写入归档文件并移出内存
+        
+        提案ID随进程从1重新编号，归档文件只保存本进程的提案，首次写入时清空旧内容
+        """
+        self._recent_executed[proposal.id] = proposal
+        if len(self._recent_executed) <= INCENTIVE_CONFIG["multisig_executed_cache_size"]:
+            return
+        
+        _, oldest = self._recent_executed.popitem(last=False)
+        try:
+            if not self._archive_offsets:
+                os.makedirs(os.path.dirname(self._archive_path), exist_ok=True)
+            with open(self._archive_path, 'ab' if self._archive_offsets else 'wb') as f:
+                offset = f.tell()
+                f.write(orjson.dumps(oldest) + b"\n")
+        except Exception as e:
+            # 写入失败时保留在内存中
+            logger.error(f"❌ 归档MultiSig提案失败: {e}")
+            return
+        self._archive_offsets[oldest.id] = offset
+        del self.proposals[oldest.id]
     
     def get_pending_proposals(self) -> list:
         """获取待处理提案"""
-        return [self.get_proposal(proposal_id) for proposal_id, proposal in self.proposals.items() 
-                if not proposal["executed"]]
+        return [self._proposal_to_dict(proposal) for proposal in self._pending_proposals.values()]
     
     # ================================
     # Reward Pool Methods
     # ================================
     
-    def deposit_to_reward_pool(self, from_role: str, amount_eth: float) -> Dict[str, Any]:
-        """向奖金池充值ETH"""
+    def deposit_to_reward_pool(self, from_role: str, amount_eth: float, persist: bool = True) -> Dict[str, Any]:
+        """向奖金池充值ETH
+        
+        persist=False时只标记余额待保存，由flush_state合并写入（连续充值时使用），
+        最迟在contribution_flush_interval秒后由定时器落盘
+        """
         try:
             # 使用Web3Manager的send_reward功能来模拟充值
             # 从指定角色向treasury账户转账
@@ -279,7 +462,13 @@ class MultiSigContract:
                 self.reward_pool_balance += amount_eth
                 
                 # 保存状态到文件
-                self._save_reward_pool_state()
+                if persist:
+                    self._save_reward_pool_state()
+                else:
+                    if not self._pool_dirty:
+                        self._pool_dirty = True
+                        self._schedule_state_flush()
+                    self.flush_state()
                 
                 logger.info(f"💰 Reward pool deposit: {amount_eth} ETH from {from_role}")
                 logger.info(f"📊 New pool balance: {self.reward_pool_balance} ETH")
@@ -290,7 +479,7 @@ class MultiSigContract:
                     "amount": amount_eth,
                     "new_balance": self.reward_pool_balance,
                     "tx_hash": deposit_result["tx_hash"],
-                    "deposited_at": datetime.now().isoformat()
+                    "deposited_at": datetime.now(timezone.utc).isoformat()
                 }
             else:
                 raise Exception(f"Deposit transaction failed: {deposit_result['error']}")
@@ -313,11 +502,11 @@ class MultiSigContract:
             return {
                 "balance": self.reward_pool_balance,
                 "balance_wei": self.web3_manager.w3.to_wei(self.reward_pool_balance, 'ether'),
-                "base_reward": 0.01,  # 基础奖励 0.01 ETH
-                "base_reward_wei": self.web3_manager.w3.to_wei(0.01, 'ether'),
+                "base_reward": _BASE_REWARD_ETH,
+                "base_reward_wei": _BASE_REWARD_WEI,
                 "treasury_balance": treasury_info["balance_eth"],
                 "treasury_address": treasury_info["address"],
-                "last_updated": datetime.now().isoformat()
+                "last_updated": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -325,8 +514,8 @@ class MultiSigContract:
             return {
                 "balance": 0,
                 "balance_wei": 0,
-                "base_reward": 0.01,
-                "base_reward_wei": self.web3_manager.w3.to_wei(0.01, 'ether'),
+                "base_reward": _BASE_REWARD_ETH,
+                "base_reward_wei": _BASE_REWARD_WEI,
                 "error": str(e)
             }
     
@@ -335,11 +524,10 @@ class MultiSigContract:
         try:
             # 简化实现：从文件恢复奖金池状态
             state_file = os.path.join(os.path.dirname(__file__), '../assets/reward_pool_state.json')
-            if os.path.exists(state_file):
-                with open(state_file, 'r') as f:
-                    state = json.load(f)
-                    self.reward_pool_balance = state.get('balance', 0.0)
-                    logger.info(f"✅ 奖金池余额从状态文件恢复: {self.reward_pool_balance} ETH")
+            state = _load_json_file(state_file)
+            if state is not None:
+                self.reward_pool_balance = state.get('balance', 0.0)
+                logger.info(f"✅ 奖金池余额从状态文件恢复: {self.reward_pool_balance} ETH")
             else:
                 logger.info("💰 奖金池状态文件不存在，余额设为 0.0 ETH")
         except Exception as e:
@@ -352,10 +540,11 @@ class MultiSigContract:
             state_file = os.path.join(os.path.dirname(__file__), '../assets/reward_pool_state.json')
             state = {
                 'balance': self.reward_pool_balance,
-                'last_updated': datetime.now().isoformat()
+                'last_updated': datetime.now(timezone.utc).isoformat()
             }
-            with open(state_file, 'w') as f:
-                json.dump(state, f)
+            _write_state_file(state_file, state)
+            self._pool_dirty = False
+            self._state_flushed_at = time.monotonic()
             logger.debug(f"📝 奖金池状态已保存: {self.reward_pool_balance} ETH")
         except Exception as e:
             logger.error(f"❌ 保存奖金池状态失败: {e}")
@@ -364,23 +553,59 @@ class MultiSigContract:
         """初始化Manager贡献度（从状态文件恢复）"""
         try:
             contrib_file = os.path.join(os.path.dirname(__file__), '../assets/contributions_state.json')
-            if os.path.exists(contrib_file):
-                with open(contrib_file, 'r') as f:
-                    self.contributions = json.load(f)
-                    logger.info(f"✅ Manager贡献度从状态文件恢复: {len(self.contributions)} 条记录")
+            contributions = _load_json_file(contrib_file)
+            if contributions is not None:
+                # 贡献记录会被原地更新，复制一份避免与缓存共享
+                self.contributions = {address: dict(record) for address, record in contributions.items()}
+                logger.info(f"✅ Manager贡献度从状态文件恢复: {len(self.contributions)} 条记录")
             else:
                 logger.info("💰 贡献度状态文件不存在，使用空记录")
         except Exception as e:
             logger.error(f"❌ 恢复Manager贡献度失败: {e}")
             self.contributions = {}
     
+    def flush_state(self, force: bool = False):
+        """将累积的贡献度更新和延迟保存的奖金池余额写入状态文件
+        
+        距上次写入超过间隔（贡献度还包括待写入条数达到上限）时才落盘，连续签名/充值只写一次；
+        force=True时立即写入（服务关闭时调用）
+        """
+        if not (self._contributions_pending or self._pool_dirty):
+            return
+        due = force or time.monotonic() - self._state_flushed_at >= INCENTIVE_CONFIG["contribution_flush_interval"]
+        if self._pool_dirty and due:
+            self._save_reward_pool_state()
+        if self._contributions_pending and (
+                due or self._contributions_pending >= INCENTIVE_CONFIG["contribution_flush_pending"]):
+            self._save_contributions_state()
+    
+    def _schedule_state_flush(self):
+        """确保有一个待执行的状态写入定时器，之后没有新的签名/充值时待保存状态也会在间隔后落盘"""
+        with self._state_flush_lock:
+            if self._state_flush_timer is not None:
+                return
+            self._state_flush_timer = threading.Timer(
+                INCENTIVE_CONFIG["contribution_flush_interval"], self._flush_state_on_timer
+            )
+            self._state_flush_timer.daemon = True
+            self._state_flush_timer.start()
+    
+    def _flush_state_on_timer(self):
+        """定时器到期：强制写入待保存的状态，写入失败时重新计时"""
+        with self._state_flush_lock:
+            self._state_flush_timer = None
+        self.flush_state(force=True)
+        if self._contributions_pending or self._pool_dirty:
+            self._schedule_state_flush()
+    
     def _save_contributions_state(self):
         """保存Manager贡献度到文件"""
         try:
             contrib_file = os.path.join(os.path.dirname(__file__), '../assets/contributions_state.json')
-            with open(contrib_file, 'w') as f:
-                json.dump(self.contributions, f, indent=2)
-            logger.debug(f"📝 Manager贡献度已保存: {len(self.contributions)} 条记录")
+            _write_state_file(contrib_file, self.contributions, orjson.OPT_INDENT_2)
+            self._contributions_pending = 0
+            self._state_flushed_at = time.monotonic()
+            logger.debug("📝 Manager贡献度已保存: %s 条记录", len(self.contributions))
         except Exception as e:
             logger.error(f"❌ 保存Manager贡献度失败: {e}")
     
@@ -405,7 +630,11 @@ class MultiSigContract:
             "last_signature_time": contribution["last_signature_time"]
         }
     
-    def _update_contribution(self, manager_role: str, proposal_created_at: str):
+    def get_contributions(self, manager_addresses: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量获取多个Manager的贡献记录（address -> 贡献记录）"""
+        return {address: self.get_contribution(address) for address in manager_addresses}
+    
+    def _update_contribution(self, manager_role: str, proposal_created_at_ns: int, signed_at_ns: int):
         """更新Manager贡献记录"""
         try:
             manager_address = self.web3_manager.accounts.get(manager_role)
@@ -425,61 +654,43 @@ class MultiSigContract:
             contribution = self.contributions[manager_address]
             
             # 计算响应时间
-            current_time = datetime.now()
-            created_time = datetime.fromisoformat(proposal_created_at)
-            response_time_seconds = (current_time - created_time).total_seconds()
+            response_time_seconds = (signed_at_ns - proposal_created_at_ns) / 1e9
             
             # 更新统计
             contribution["total_signatures"] += 1
             contribution["total_response_time"] += response_time_seconds
-            contribution["last_signature_time"] = current_time.isoformat()
+            contribution["last_signature_time"] = _format_ns(signed_at_ns)
             
             # 计算质量评分（0-100分标准化）
             contribution["quality_score"] = self._calculate_quality_score(
                 response_time_seconds, 
-                contribution["last_signature_time"]
+                signed_at_ns
             )
             
-            logger.info(f"📈 Updated contribution for {manager_role}: {contribution['total_signatures']} signatures, quality: {contribution['quality_score']}")
+            logger.info("📈 Updated contribution for %s: %s signatures, quality: %s",
+                        manager_role, contribution['total_signatures'], contribution['quality_score'])
             
-            # 保存贡献度状态
-            self._save_contributions_state()
+            # 标记贡献度待保存（签名密集时合并写入）
+            self._contributions_pending += 1
+            if self._contributions_pending == 1:
+                self._schedule_state_flush()
+            self.flush_state()
             
         except Exception as e:
             logger.error(f"❌ Failed to update contribution for {manager_role}: {e}")
     
-    def _calculate_quality_score(self, response_time_seconds: float, last_signature_time: str) -> int:
+    def _calculate_quality_score(self, response_time_seconds: float, last_signature_ns: Optional[int]) -> int:
         """计算质量评分（0-100分）"""
         # 响应速度分（60%权重）
-        if response_time_seconds <= 10:
-            speed_score = 60
-        elif response_time_seconds <= 30:
-            speed_score = 50
-        elif response_time_seconds <= 60:
-            speed_score = 40
-        elif response_time_seconds <= 120:
-            speed_score = 30
-        elif response_time_seconds <= 300:
-            speed_score = 20
-        else:
-            speed_score = 10
+        speed_score = _SPEED_SCORES[bisect_left(_SPEED_THRESHOLDS, response_time_seconds)]
         
-        # 活跃度分（40%权重）
-        try:
-            last_time = datetime.fromisoformat(last_signature_time)
-            minutes_since_last = (datetime.now() - last_time).total_seconds() / 60
-            
-            if minutes_since_last <= 10:
-                activity_score = 40
-            elif minutes_since_last <= 30:
-                activity_score = 30
-            elif minutes_since_last <= 60:
-                activity_score = 20
-            else:
-                activity_score = 10
-        except:
+        # 活跃度分（40%权重），按纳秒整数比较，无需解析时间字符串
+        if last_signature_ns is None:
             # 如果是第一次签名，给满分活跃度
             activity_score = 40
+        else:
+            since_last_ns = time.time_ns() - last_signature_ns
+            activity_score = _ACTIVITY_SCORES[bisect_left(_ACTIVITY_THRESHOLDS, since_last_ns)]
         
         return int(speed_score + activity_score)  # 0-100分
     
@@ -510,31 +721,37 @@ class MultiSigContract:
             available_rewards = max(0, self.reward_pool_balance - 0.1)
             distribution_results = []
             
-            # 按比例分配奖励
+            # 先按比例计算全部奖励，再一次性提交转账
+            rewards = []
             for manager_role, score in manager_scores.items():
                 if score > 0:
                     reward_amount = (available_rewards * score) / total_contribution_score
                     
                     if reward_amount > 0.001:  # 最小奖励阈值
-                        reward_result = self.web3_manager.send_reward('treasury', manager_role, reward_amount)
-                        
-                        if reward_result["success"]:
-                            self.reward_pool_balance -= reward_amount
-                            distribution_results.append({
-                                "manager_role": manager_role,
-                                "reward_amount": reward_amount,
-                                "contribution_score": score,
-                                "tx_hash": reward_result["tx_hash"]
-                            })
+                        rewards.append((manager_role, reward_amount))
+            
+            reward_results = self.web3_manager.send_rewards('treasury', rewards)
+            
+            total_distributed = 0.0
+            for (manager_role, reward_amount), reward_result in zip(rewards, reward_results):
+                if reward_result["success"]:
+                    self.reward_pool_balance -= reward_amount
+                    total_distributed += reward_amount
+                    distribution_results.append({
+                        "manager_role": manager_role,
+                        "reward_amount": reward_amount,
+                        "contribution_score": manager_scores[manager_role],
+                        "tx_hash": reward_result["tx_hash"]
+                    })
             
             logger.info(f"🎁 Distributed {len(distribution_results)} contribution rewards")
             
             return {
                 "success": True,
                 "distributions": distribution_results,
-                "total_distributed": sum(r["reward_amount"] for r in distribution_results),
+                "total_distributed": total_distributed,
                 "remaining_pool": self.reward_pool_balance,
-                "distributed_at": datetime.now().isoformat()
+                "distributed_at": datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -550,22 +767,20 @@ class MultiSigContract:
     
     def is_authorized_creator(self, role: str) -> bool:
         """检查角色是否有权限创建提案 (Operator或Manager)"""
-        return role in ["operator_0", "operator_1", "operator_2", "operator_3", "operator_4", 
-                       "manager_0", "manager_1", "manager_2"]
+        return role in _AUTHORIZED_CREATORS
     
     def is_authorized_signer(self, role: str) -> bool:
         """检查角色是否有权限签名提案 (仅Manager)"""
-        return role in ["manager_0", "manager_1", "manager_2"]
+        return role in _AUTHORIZED_SIGNERS
     
     def get_user_role(self, user_address: str) -> str:
         """根据地址获取用户角色"""
         # 反向查找角色
-        for role, address in self.web3_manager.accounts.items():
-            if address.lower() == user_address.lower():
-                if role in ["manager_0", "manager_1", "manager_2"]:
-                    return "MANAGER"
-                elif role.startswith("operator_"):
-                    return "OPERATOR"
+        role = self.web3_manager.get_role_by_address(user_address)
+        if role in _AUTHORIZED_SIGNERS:
+            return "MANAGER"
+        elif role is not None and role.startswith("operator_"):
+            return "OPERATOR"
         return "NONE"
     
     def get_role_info(self, role: str) -> Dict[str, Any]:
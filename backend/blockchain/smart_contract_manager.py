@@ -5,13 +5,28 @@
 
 import json
 import logging
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
 from web3 import Web3
 from web3.contract import Contract
-from datetime import datetime
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
+# 合约事件签名的topic0哈希（事件签名固定，导入时计算一次）
+TOPIC_PROPOSAL_CREATED = Web3.keccak(text="ProposalCreated(uint256,address,address,uint256)")
+TOPIC_PROPOSAL_SIGNED = Web3.keccak(text="ProposalSigned(uint256,address)")
+TOPIC_PROPOSAL_EXECUTED = Web3.keccak(text="ProposalExecuted(uint256,address,address,uint256)")
+
+@lru_cache(maxsize=1)
+def _load_contract_artifacts() -> Tuple[str, List[Dict]]:
+    """读取部署地址和ABI，进程内只解析一次（重新部署后需重启服务）"""
+    with open('backend/assets/multisig_contract.json', 'r') as f:
+        address = json.load(f)['address']
+    with open('backend/assets/multisig_interface.json', 'r') as f:
+        abi = json.load(f)['abi']
+    return address, abi
+
 class SmartContractManager:
     """真正的智能合约管理器"""
     
@@ -26,15 +41,8 @@ class SmartContractManager:
     def _load_contract_config(self):
         """加载合约配置和ABI"""
         try:
-            # 加载合约地址配置
-            with open('backend/assets/multisig_contract.json', 'r') as f:
-                config = json.load(f)
-                self.contract_address = config['address']
-            
-            # 加载合约ABI
-            with open('backend/assets/multisig_interface.json', 'r') as f:
-                interface = json.load(f)
-                self.contract_abi = interface['abi']
+            # 加载合约地址和ABI（模块级缓存）
+            self.contract_address, self.contract_abi = _load_contract_artifacts()
             
             # 创建合约实例
             self.contract = self.w3.eth.contract(
@@ -42,6 +50,11 @@ class SmartContractManager:
                 abi=self.contract_abi
             )
             
+            # 事件解码器只创建一次，解析日志时复用
+            self.proposal_created_event = self.contract.events.ProposalCreated()
+            self.proposal_signed_event = self.contract.events.ProposalSigned()
+            self.proposal_executed_event = self.contract.events.ProposalExecuted()
+            
             logger.info(f"✅ 智能合约加载成功: {self.contract_address}")
             
         except Exception as e:
@@ -56,7 +69,6 @@ class SmartContractManager:
             
             # 获取操作员账户
             operator_account = self.web3_manager.accounts[operator_role]
-            operator_private_key = self.web3_manager.private_keys[operator_role]
             
             # 构建交易
             function_call = self.contract.functions.createProposal(
@@ -68,33 +80,24 @@ class SmartContractManager:
             # 估算gas
             gas_estimate = function_call.estimate_gas({'from': operator_account})
             
-            # 构建交易
-            transaction = function_call.build_transaction({
+            # 构建交易，使用本地预留的nonce签名并发送
+            tx_hash = self.web3_manager.send_signed_transaction(operator_role, lambda nonce: function_call.build_transaction({
                 'from': operator_account,
                 'gas': gas_estimate,
                 'gasPrice': self.w3.to_wei('1', 'gwei'),
-                'nonce': self.w3.eth.get_transaction_count(operator_account)
-            })
-            
-            # 签名并发送交易
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction, 
-                private_key=operator_private_key
-            )
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+                'nonce': nonce
+            }))
             
             # 等待交易确认
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.web3_manager.wait_for_receipt(tx_hash)
             
             # 解析事件获取提案ID
             proposal_id = None
             for log in receipt.logs:
-                try:
-                    decoded_log = self.contract.events.ProposalCreated().process_log(log)
+                if log['topics'] and log['topics'][0] == TOPIC_PROPOSAL_CREATED:
+                    decoded_log = self.proposal_created_event.process_log(log)
                     proposal_id = decoded_log['args']['proposalId']
                     break
-                except:
-                    continue
             
             if proposal_id is None:
                 raise ValueError("无法从交易日志中获取提案ID")
@@ -110,7 +113,7 @@ class SmartContractManager:
                 'target': target_address,
                 'amount': amount_eth,
                 'creator': operator_account,
-                'created_at': datetime.now().isoformat()
+                'created_at': datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -125,7 +128,6 @@ class SmartContractManager:
         try:
             # 获取管理员账户
             manager_account = self.web3_manager.accounts[manager_role]
-            manager_private_key = self.web3_manager.private_keys[manager_role]
             
             # 获取提案信息，检查是否存在
             try:
@@ -147,38 +149,29 @@ class SmartContractManager:
             # 估算gas
             gas_estimate = function_call.estimate_gas({'from': manager_account})
             
-            # 构建交易
-            transaction = function_call.build_transaction({
+            # 构建交易，使用本地预留的nonce签名并发送
+            tx_hash = self.web3_manager.send_signed_transaction(manager_role, lambda nonce: function_call.build_transaction({
                 'from': manager_account,
                 'gas': gas_estimate,
                 'gasPrice': self.w3.to_wei('1', 'gwei'),
-                'nonce': self.w3.eth.get_transaction_count(manager_account)
-            })
-            
-            # 签名并发送交易
-            signed_txn = self.w3.eth.account.sign_transaction(
-                transaction, 
-                private_key=manager_private_key
-            )
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+                'nonce': nonce
+            }))
             
             # 等待交易确认
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.web3_manager.wait_for_receipt(tx_hash)
             
             # 检查是否自动执行
             executed = False
             execution_tx_hash = None
             
             for log in receipt.logs:
-                try:
-                    # 检查ProposalExecuted事件
-                    decoded_log = self.contract.events.ProposalExecuted().process_log(log)
+                # 检查ProposalExecuted事件
+                if log['topics'] and log['topics'][0] == TOPIC_PROPOSAL_EXECUTED:
+                    decoded_log = self.proposal_executed_event.process_log(log)
                     if decoded_log['args']['proposalId'] == proposal_id:
                         executed = True
                         execution_tx_hash = tx_hash.hex()
                         break
-                except:
-                    continue
             
             logger.info(f"✅ 智能合约提案签名成功: ID-{proposal_id}, 管理员: {manager_role}")
             if executed:
@@ -194,7 +187,7 @@ class SmartContractManager:
                 'gas_used': receipt['gasUsed'],
                 'executed': executed,
                 'execution_tx_hash': execution_tx_hash,
-                'signed_at': datetime.now().isoformat()
+                'signed_at': datetime.now(timezone.utc).isoformat()
             }
             
         except Exception as e:
@@ -231,15 +224,17 @@ class SmartContractManager:
     def get_all_proposals(self) -> List[Dict]:
         """获取所有提案（通过事件日志）"""
         try:
-            # 获取所有ProposalCreated事件
-            proposal_filter = self.contract.events.ProposalCreated.create_filter(
-                fromBlock=0,
-                toBlock='latest'
-            )
+            # 获取所有ProposalCreated事件（一次eth_getLogs，无需在节点上创建过滤器）
+            logs = self.w3.eth.get_logs({
+                'address': self.contract_address,
+                'topics': [Web3.to_hex(TOPIC_PROPOSAL_CREATED)],
+                'fromBlock': 0,
+                'toBlock': 'latest',
+            })
             
             proposals = []
-            for event in proposal_filter.get_all_entries():
-                proposal_id = event['args']['proposalId']
+            for log in logs:
+                proposal_id = self.proposal_created_event.process_log(log)['args']['proposalId']
                 proposal_data = self.get_proposal(proposal_id)
                 if proposal_data:
                     proposals.append(proposal_data)
@@ -3,15 +3,27 @@ Web3连接和账户管理模块
 """
 
 from web3 import Web3
+from web3.exceptions import TimeExhausted, TransactionNotFound
 from eth_account import Account
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
 import logging
 import json
 import os
+import threading
+import time
 from ..config import GANACHE_CONFIG, INCENTIVE_CONFIG
 
 logger = logging.getLogger(__name__)
 
+# 节点拒绝交易时表示本地nonce与链上不一致的错误信息片段
+_NONCE_ERROR_MARKERS = ("nonce", "replacement transaction underpriced", "already known", "known transaction")
+
+def _is_nonce_error(error: Exception) -> bool:
+    """判断提交失败是否由nonce冲突引起"""
+    message = str(error).lower()
+    return any(marker in message for marker in _NONCE_ERROR_MARKERS)
+
 class Web3Manager:
     """Web3连接和账户管理器"""
     
@@ -19,7 +31,16 @@ class Web3Manager:
         self.w3: Optional[Web3] = None
         self.accounts: Dict[str, str] = {}  # role -> address
         self.private_keys: Dict[str, str] = {}  # role -> private_key
+        self._roles_by_address: Optional[Dict[str, str]] = None  # address(校验和/小写) -> role（按需构建）
         self.multisig_contract = None
+        self._chain_id: Optional[int] = None
+        self._gas_price_cache: Optional[Tuple[int, float]] = None  # (gas_price, 获取时间)
+        self._nonces: Dict[str, int] = {}  # role -> 下一个可用nonce（首次使用时从链上同步）
+        self._nonce_lock = threading.Lock()
+        # 并发RPC查询复用的线程池（应用关闭时由shutdown()释放）
+        self._rpc_executor = ThreadPoolExecutor(
+            max_workers=GANACHE_CONFIG['rpc_max_workers'], thread_name_prefix="web3-rpc"
+        )
         self._initialize_connection()
         self._setup_accounts()
         self._initialize_multisig_contract()
@@ -32,12 +53,14 @@ class Web3Manager:
             if not self.w3.is_connected():
                 raise ConnectionError(f"无法连接到Ganache: {GANACHE_CONFIG['rpc_url']}")
             
-            logger.info(f"✅ Web3连接成功: {GANACHE_CONFIG['rpc_url']}")
-            logger.info(f"🔗 网络ID: {self.w3.eth.chain_id}")
-            logger.info(f"📦 当前区块: {self.w3.eth.block_number}")
+            logger.info("✅ Web3连接成功: %s", GANACHE_CONFIG['rpc_url'])
+            # 同一网络的chain_id不会变化，只查询一次
+            self._chain_id = self.w3.eth.chain_id
+            logger.info("🔗 网络ID: %s", self._chain_id)
+            logger.info("📦 当前区块: %s", self.w3.eth.block_number)
             
         except Exception as e:
-            logger.error(f"❌ Web3连接失败: {e}")
+            logger.error("❌ Web3连接失败: %s", e)
             raise
     
     def _setup_accounts(self):
@@ -63,44 +86,103 @@ class Web3Manager:
                 balance = self.w3.eth.get_balance(account.address)
                 balance_eth = self.w3.from_wei(balance, 'ether')
                 
-                logger.info(f"👛 {role}: {account.address} (余额: {balance_eth} ETH)")
+                logger.info("👛 %s: %s (余额: %s ETH)", role, account.address, balance_eth)
             
+            self.invalidate_account_map()
             logger.info("✅ 账户设置完成")
             
         except Exception as e:
-            logger.error(f"❌ 账户设置失败: {e}")
+            logger.error("❌ 账户设置失败: %s", e)
             raise
     
+    def invalidate_account_map(self):
+        """账户映射变化后清除地址->角色的反向映射"""
+        self._roles_by_address = None
+    
+    def get_role_by_address(self, address: str) -> Optional[str]:
+        """根据地址反查角色（不区分大小写），未知地址返回None
+        
+        事件参数和账户地址都是校验和格式，先按原字符串直接查找，查不到再转小写
+        """
+        if self._roles_by_address is None:
+            roles_by_address = {}
+            for role, addr in self.accounts.items():
+                roles_by_address.setdefault(addr, role)
+                roles_by_address.setdefault(addr.lower(), role)
+            self._roles_by_address = roles_by_address
+        return self._roles_by_address.get(address) or self._roles_by_address.get(address.lower())
+    
     def get_account_info(self, role: str) -> Dict:
         """获取账户信息"""
         if role not in self.accounts:
             raise ValueError(f"未知角色: {role}")
         
-        address = self.accounts[role]
-        balance = self.w3.eth.get_balance(address)
-        
-        return {
-            "role": role,
-            "address": address,
-            "balance_wei": balance,
-            "balance_eth": float(self.w3.from_wei(balance, 'ether')),
-            "nonce": self.w3.eth.get_transaction_count(address)
-        }
+        return self._query_accounts([role])[0]
     
     def get_all_accounts_info(self) -> List[Dict]:
         """获取所有账户信息"""
+        return self._query_accounts(list(self.accounts.keys()))
+    
+    def _query_accounts(self, roles: List[str]) -> List[Dict]:
+        """并发查询一组角色的余额和nonce
+        
+        web3 6.x的HTTPProvider不支持批量JSON-RPC，这里把2N个请求同时发出，
+        总耗时约等于一次往返而不是2N次
+        """
+        calls = []
+        for role in roles:
+            address = self.accounts[role]
+            calls.append((self.w3.eth.get_balance, address))
+            calls.append((self.w3.eth.get_transaction_count, address))
+        
+        results = self._call_concurrently(calls)
+        
         accounts_info = []
-        for role in self.accounts.keys():
-            accounts_info.append(self.get_account_info(role))
+        for i, role in enumerate(roles):
+            balance, nonce = results[2 * i], results[2 * i + 1]
+            accounts_info.append({
+                "role": role,
+                "address": self.accounts[role],
+                "balance_wei": balance,
+                "balance_eth": float(self.w3.from_wei(balance, 'ether')),
+                "nonce": nonce
+            })
         return accounts_info
     
+    def _call_concurrently(self, calls: List[Tuple]) -> List:
+        """在共享线程池中并发执行 (函数, *参数) 形式的RPC调用，按原顺序返回结果，任一调用失败即抛出"""
+        if len(calls) <= 1:
+            return [func(*args) for func, *args in calls]
+        futures = [self._rpc_executor.submit(func, *args) for func, *args in calls]
+        return [future.result() for future in futures]
+    
+    def shutdown(self):
+        """释放并发RPC线程池"""
+        self._rpc_executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _get_gas_price(self) -> int:
+        """获取gas价格，在gas_price_ttl秒内复用上次查询结果"""
+        now = time.monotonic()
+        cached = self._gas_price_cache
+        if cached is not None and now - cached[1] < GANACHE_CONFIG['gas_price_ttl']:
+            return cached[0]
+        gas_price = self.w3.eth.gas_price
+        self._gas_price_cache = (gas_price, now)
+        return gas_price
+    
     def get_network_info(self) -> Dict:
         """获取网络信息"""
+        eth = self.w3.eth
+        block_number, gas_price, is_connected = self._call_concurrently([
+            (lambda: eth.block_number,),
+            (lambda: eth.gas_price,),
+            (self.w3.is_connected,),
+        ])
         return {
-            "chain_id": self.w3.eth.chain_id,
-            "block_number": self.w3.eth.block_number,
-            "gas_price": self.w3.eth.gas_price,
-            "is_connected": self.w3.is_connected(),
+            "chain_id": self._chain_id,
+            "block_number": block_number,
+            "gas_price": gas_price,
+            "is_connected": is_connected,
             "rpc_url": GANACHE_CONFIG['rpc_url']
         }
     
@@ -110,52 +192,157 @@ class Web3Manager:
             amount_eth = INCENTIVE_CONFIG['proposal_reward']
         
         try:
-            from_address = self.accounts[from_role]
-            to_address = self.accounts[to_role]
-            from_private_key = self.private_keys[from_role]
-            
-            # 构建交易
-            amount_wei = self.w3.to_wei(amount_eth, 'ether')
-            nonce = self.w3.eth.get_transaction_count(from_address)
-            
-            transaction = {
-                'to': to_address,
-                'value': amount_wei,
-                'gas': 21000,
-                'gasPrice': self.w3.eth.gas_price,
-                'nonce': nonce,
-                'chainId': self.w3.eth.chain_id
-            }
-            
             # 签名并发送交易
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, from_private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            tx_hash = self._submit_transfer(from_role, to_role, amount_eth, self._get_gas_price())
             
             # 等待交易确认
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            receipt = self.wait_for_receipt(tx_hash)
             
-            logger.info(f"💰 奖励发送成功: {amount_eth} ETH from {from_role} to {to_role}")
-            logger.info(f"📝 交易哈希: {tx_hash.hex()}")
-            
-            return {
-                "success": True,
-                "tx_hash": tx_hash.hex(),
-                "from_role": from_role,
-                "to_role": to_role,
-                "amount_eth": amount_eth,
-                "gas_used": receipt.gasUsed,
-                "block_number": receipt.blockNumber
-            }
+            return self._reward_success(from_role, to_role, amount_eth, tx_hash, receipt)
             
         except Exception as e:
-            logger.error(f"❌ 奖励发送失败: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "from_role": from_role,
-                "to_role": to_role,
-                "amount_eth": amount_eth
-            }
+            return self._reward_failure(from_role, to_role, amount_eth, e)
+    
+    def send_rewards(self, from_role: str, rewards: List[Tuple[str, float]]) -> List[Dict]:
+        """批量发送奖励：以本地预留的连续nonce一次性提交所有交易，再统一等待确认
+        
+        返回结果与rewards一一对应，格式同send_reward
+        """
+        results: List[Optional[Dict]] = [None] * len(rewards)
+        submitted = []  # (index, tx_hash)
+        
+        try:
+            gas_price = self._get_gas_price()
+        except Exception as e:
+            return [self._reward_failure(from_role, to_role, amount_eth, e) for to_role, amount_eth in rewards]
+        
+        # 依次签名提交（不等待确认）
+        for index, (to_role, amount_eth) in enumerate(rewards):
+            try:
+                tx_hash = self._submit_transfer(from_role, to_role, amount_eth, gas_price)
+                submitted.append((index, tx_hash))
+            except Exception as e:
+                results[index] = self._reward_failure(from_role, to_role, amount_eth, e)
+        
+        # 在当前线程轮询等待所有交易确认
+        if submitted:
+            receipts = self.wait_for_receipts([tx_hash for _, tx_hash in submitted])
+            for (index, tx_hash), (receipt, error) in zip(submitted, receipts):
+                to_role, amount_eth = rewards[index]
+                if error is None:
+                    results[index] = self._reward_success(from_role, to_role, amount_eth, tx_hash, receipt)
+                else:
+                    results[index] = self._reward_failure(from_role, to_role, amount_eth, error)
+        
+        return results
+    
+    def _submit_transfer(self, from_role: str, to_role: str, amount_eth: float, gas_price: int):
+        """构建、签名并提交ETH转账交易，返回交易哈希"""
+        value = self.w3.to_wei(amount_eth, 'ether')
+        return self.send_signed_transaction(from_role, lambda nonce: {
+            'to': self.accounts[to_role],
+            'value': value,
+            'gas': 21000,
+            'gasPrice': gas_price,
+            'nonce': nonce,
+            'chainId': self._chain_id
+        })
+    
+    def reserve_nonce(self, role: str) -> int:
+        """为角色原子地预留下一个nonce，首次使用时以链上pending计数为起点"""
+        with self._nonce_lock:
+            nonce = self._nonces.get(role)
+            if nonce is None:
+                nonce = self.w3.eth.get_transaction_count(self.accounts[role], 'pending')
+            self._nonces[role] = nonce + 1
+            return nonce
+    
+    def reset_nonce(self, role: str):
+        """丢弃本地nonce，下次预留时重新从链上同步"""
+        with self._nonce_lock:
+            self._nonces.pop(role, None)
+    
+    def send_signed_transaction(self, role: str, build_transaction: Callable[[int], Dict]):
+        """预留nonce、构建并签名提交交易，返回交易哈希
+        
+        build_transaction接收nonce返回交易字典。提交失败时本地nonce作废并重新同步，
+        若是nonce冲突则用新nonce重试一次
+        """
+        for attempt in range(2):
+            nonce = self.reserve_nonce(role)
+            try:
+                signed_txn = self.w3.eth.account.sign_transaction(
+                    build_transaction(nonce), self.private_keys[role]
+                )
+                return self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+            except Exception as e:
+                # 节点未接受该nonce，避免后续交易卡在空洞之后
+                self.reset_nonce(role)
+                if attempt or not _is_nonce_error(e):
+                    raise
+                logger.warning("⚠️ %s nonce %d 冲突，重新同步后重试: %s", role, nonce, e)
+    
+    def wait_for_receipt(self, tx_hash):
+        """按配置的轮询间隔等待交易回执"""
+        return self.w3.eth.wait_for_transaction_receipt(
+            tx_hash, poll_latency=GANACHE_CONFIG['receipt_poll_latency']
+        )
+    
+    def wait_for_receipts(self, tx_hashes: List, timeout: float = 120) -> List[Tuple[Optional[Dict], Optional[Exception]]]:
+        """在一个线程内轮询等待多笔交易回执，返回与tx_hashes对应的(receipt, error)
+        
+        每轮只查询尚未确认的交易，不再为每笔交易占用一个等待线程
+        """
+        results: List[Optional[Tuple[Optional[Dict], Optional[Exception]]]] = [None] * len(tx_hashes)
+        pending = list(range(len(tx_hashes)))
+        deadline = time.monotonic() + timeout
+        
+        while True:
+            still_pending = []
+            for index in pending:
+                try:
+                    results[index] = (self.w3.eth.get_transaction_receipt(tx_hashes[index]), None)
+                except TransactionNotFound:
+                    still_pending.append(index)
+                except Exception as e:
+                    results[index] = (None, e)
+            pending = still_pending
+            
+            if not pending:
+                return results
+            if time.monotonic() >= deadline:
+                for index in pending:
+                    results[index] = (None, TimeExhausted(
+                        f"交易 {Web3.to_hex(tx_hashes[index])} 在 {timeout} 秒内未确认"
+                    ))
+                return results
+            time.sleep(GANACHE_CONFIG['receipt_poll_latency'])
+    
+    def _reward_success(self, from_role: str, to_role: str, amount_eth: float, tx_hash, receipt) -> Dict:
+        """构建奖励发送成功结果"""
+        logger.info("💰 奖励发送成功: %s ETH from %s to %s", amount_eth, from_role, to_role)
+        logger.info("📝 交易哈希: %s", tx_hash.hex())
+        
+        return {
+            "success": True,
+            "tx_hash": tx_hash.hex(),
+            "from_role": from_role,
+            "to_role": to_role,
+            "amount_eth": amount_eth,
+            "gas_used": receipt.gasUsed,
+            "block_number": receipt.blockNumber
+        }
+    
+    def _reward_failure(self, from_role: str, to_role: str, amount_eth: float, error: Exception) -> Dict:
+        """构建奖励发送失败结果"""
+        logger.error("❌ 奖励发送失败: %s", error)
+        return {
+            "success": False,
+            "error": str(error),
+            "from_role": from_role,
+            "to_role": to_role,
+            "amount_eth": amount_eth
+        }
     
     def estimate_gas(self, transaction: Dict) -> int:
         """估算Gas费用"""
@@ -177,13 +364,13 @@ class Web3Manager:
             if os.path.exists(config_path):
                 with open(config_path, 'r') as f:
                     self.multisig_config = json.load(f)
-                logger.info(f"✅ MultiSig合约集成成功: {self.multisig_config['address']}")
+                logger.info("✅ MultiSig合约集成成功: %s", self.multisig_config['address'])
             else:
-                logger.warning(f"⚠️ MultiSig合约配置文件不存在: {config_path}")
+                logger.warning("⚠️ MultiSig合约配置文件不存在: %s", config_path)
                 self.multisig_config = None
                 
         except Exception as e:
-            logger.error(f"❌ MultiSig合约初始化失败: {e}")
+            logger.error("❌ MultiSig合约初始化失败: %s", e)
             self.multisig_contract = None
             self.multisig_config = None
     
@@ -207,7 +394,7 @@ class Web3Manager:
             return self.multisig_contract.create_proposal(target_address, amount_eth, data, creator_role)
             
         except Exception as e:
-            logger.error(f"❌ Failed to create multisig proposal: {e}")
+            logger.error("❌ Failed to create multisig proposal: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -225,7 +412,7 @@ class Web3Manager:
             return self.multisig_contract.sign_proposal(proposal_id, signer_role)
             
         except Exception as e:
-            logger.error(f"❌ Failed to sign multisig proposal: {e}")
+            logger.error("❌ Failed to sign multisig proposal: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -253,7 +440,7 @@ class Web3Manager:
                 }
                 
         except Exception as e:
-            logger.error(f"❌ Failed to get multisig proposal: {e}")
+            logger.error("❌ Failed to get multisig proposal: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -275,7 +462,7 @@ class Web3Manager:
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to get multisig info: {e}")
+            logger.error("❌ Failed to get multisig info: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -289,7 +476,7 @@ class Web3Manager:
         try:
             return self.multisig_contract.has_signed(proposal_id, signer_role)
         except Exception as e:
-            logger.error(f"❌ Failed to check multisig signature: {e}")
+            logger.error("❌ Failed to check multisig signature: %s", e)
             return False
     
     # ================================
@@ -308,7 +495,7 @@ class Web3Manager:
             return self.multisig_contract.deposit_to_reward_pool(from_role, amount_eth)
             
         except Exception as e:
-            logger.error(f"❌ Failed to deposit to reward pool: {e}")
+            logger.error("❌ Failed to deposit to reward pool: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -330,7 +517,7 @@ class Web3Manager:
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to get reward pool info: {e}")
+            logger.error("❌ Failed to get reward pool info: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -356,7 +543,7 @@ class Web3Manager:
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to get manager contribution: {e}")
+            logger.error("❌ Failed to get manager contribution: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -371,18 +558,16 @@ class Web3Manager:
             }
         
         try:
-            contributions = {}
+            # 一次批量查询所有Manager角色的贡献
+            manager_roles = [role for role in ("manager_0", "manager_1", "manager_2") if role in self.accounts]
+            by_address = self.multisig_contract.get_contributions(
+                [self.accounts[role] for role in manager_roles]
+            )
             
-            # 获取所有Manager角色的贡献
-            manager_roles = ["manager_0", "manager_1", "manager_2"]
-            for role in manager_roles:
-                if role in self.accounts:
-                    manager_address = self.accounts[role]
-                    contribution = self.multisig_contract.get_contribution(manager_address)
-                    contributions[role] = {
-                        "address": manager_address,
-                        **contribution
-                    }
+            contributions = {
+                role: {"address": self.accounts[role], **by_address[self.accounts[role]]}
+                for role in manager_roles
+            }
             
             return {
                 "success": True,
@@ -390,7 +575,7 @@ class Web3Manager:
             }
             
         except Exception as e:
-            logger.error(f"❌ Failed to get all manager contributions: {e}")
+            logger.error("❌ Failed to get all manager contributions: %s", e)
             return {
                 "success": False,
                 "error": str(e)
@@ -408,7 +593,7 @@ class Web3Manager:
             return self.multisig_contract.distribute_contribution_rewards(admin_role)
             
         except Exception as e:
-            logger.error(f"❌ Failed to distribute contribution rewards: {e}")
+            logger.error("❌ Failed to distribute contribution rewards: %s", e)
             return {
                 "success": False,
                 "error": str(e)
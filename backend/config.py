@@ -13,11 +13,24 @@ ASSETS_DIR = BACKEND_ROOT / "assets"
 MODEL_PACKAGE_DIR = ASSETS_DIR / "model_package"
 DATA_DIR = ASSETS_DIR / "data"
 
+# 运行时生成的数据目录（不纳入版本控制）
+RUNTIME_DIR = BACKEND_ROOT / "runtime"
+
 # 区块链配置
 GANACHE_CONFIG = {
     "mnemonic": "bulk tonight audit hover toddler orange boost twenty biology flower govern soldier",
     "rpc_url": "http://127.0.0.1:8545",
+    "ws_url": "ws://127.0.0.1:8545",  # 事件订阅地址（eth_subscribe），为空或不可用时回退为轮询
     "block_time": 5,
+    "gas_price_ttl": 10.0,          # 转账使用的gas价格缓存时长（秒）
+    "rpc_max_workers": 20,          # 并发查询账户/网络信息的RPC线程池大小（每个角色2个请求）
+    "receipt_poll_latency": 1.0,    # 等待交易回执时的轮询间隔（秒），出块间隔远大于web3默认的0.1秒
+    "log_batch_blocks": 500,        # 事件日志补拉的初始区块跨度（eth_getLogs每次请求）
+    "log_batch_min_blocks": 50,     # 请求超时后跨度减半的下限
+    "log_batch_max_blocks": 5000,   # 快速成功后跨度翻倍的上限
+    "log_batch_fast_seconds": 1.0,  # 单次请求耗时低于该值视为快速成功
+    "log_dedup_size": 10000,        # 已处理事件日志(txHash, logIndex)的去重记录上限
+    "proposal_id_cache_size": 4096, # 合约提案ID到数据库提案主键的缓存上限
     "accounts": {
         "manager_0": 0,   # Manager 账户索引
         "manager_1": 1,
@@ -41,6 +54,11 @@ AI_MODEL_CONFIG = {
     "model_info_file": MODEL_PACKAGE_DIR / "model_info.json",
     "selected_features_file": MODEL_PACKAGE_DIR / "selected_features.json",
     "inference_data_file": DATA_DIR / "inference_data.pt",
+    "prediction_chunk_size": 4096,    # 预计算推理结果时的分块大小
+    "compile_backend": "torchscript", # 推理模型编译方式：torchscript / torch_compile / none
+    "compile_warmup_runs": 3,         # 编译后预热次数
+    "jit_optimized_execution": False, # TorchScript执行器profiling优化（冻结后的静态图关闭可省去首次调用的profiling开销）
+    "quantize_int8": False,           # Linear层int8动态量化（会轻微改变置信度，默认关闭）
 }
 
 # 威胁检测置信度阈值
@@ -54,12 +72,24 @@ THREAT_THRESHOLDS = {
 # 激励系统配置
 INCENTIVE_CONFIG = {
     "proposal_reward": 0.01,  # ETH，给最终签名者的奖励
+    "query_cache_ttl": 3.0,   # 秒，奖金池/贡献度查询结果的缓存时间
+    "contribution_flush_interval": 5.0,  # 秒，贡献度/奖金池状态文件合并写入的最短间隔
+    "contribution_flush_pending": 10,    # 累积该数量的贡献度更新时立即写入
+    "multisig_executed_cache_size": 1024,  # 内存中保留的已执行MultiSig提案数，更早的写入归档文件
+    "multisig_archive_file": RUNTIME_DIR / "multisig_executed_archive.jsonl",
 }
 
 # 数据库配置
 DATABASE_CONFIG = {
     "url": f"sqlite:///{BACKEND_ROOT}/security_platform.db",
     "echo": False,  # 生产环境设为 False
+    "pool_size": 16,       # 连接池常驻连接数
+    "max_overflow": 32,    # 突发时允许额外创建的连接数
+    "pool_recycle": 1800,  # 连接最长复用时间（秒），避免使用被服务端关闭的空闲连接
+    "bulk_copy_threshold": 100,  # PostgreSQL下批量写入检测日志超过该行数时使用COPY
+    "deferred_log_flush_interval": 0.2,  # 延迟写入的检测日志刷新间隔（秒）
+    "deferred_log_flush_size": 50,       # 缓冲达到该条数时立即刷新
+    "deferred_log_buffer_size": 10000,   # 缓冲达到该条数时在请求线程中同步写入（不丢弃记录）
 }
 
 # 网络可视化配置
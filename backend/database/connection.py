@@ -2,7 +2,8 @@
 数据库连接和初始化
 """
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -14,6 +15,12 @@ from ..config import DATABASE_CONFIG
 
 logger = logging.getLogger(__name__)
 
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def json_dumps(value) -> str:
+    """JSON列序列化（orjson，兼容numpy数值与非字符串键）"""
+    return orjson.dumps(value, option=_ORJSON_OPTIONS).decode()
+
 class DatabaseManager:
     """数据库管理器"""
     
@@ -29,7 +36,13 @@ class DatabaseManager:
             self.engine = create_engine(
                 DATABASE_CONFIG['url'],
                 echo=DATABASE_CONFIG['echo'],
-                pool_pre_ping=True  # 连接池预检
+                pool_pre_ping=True,  # 连接池预检
+                pool_size=DATABASE_CONFIG['pool_size'],
+                max_overflow=DATABASE_CONFIG['max_overflow'],
+                pool_recycle=DATABASE_CONFIG['pool_recycle'],
+                # detection_data等JSON列在写入/读取热路径上使用orjson编解码
+                json_serializer=json_dumps,
+                json_deserializer=orjson.loads
             )
             
             # 创建会话工厂
@@ -42,12 +55,42 @@ class DatabaseManager:
             # 创建所有表
             Base.metadata.create_all(bind=self.engine)
             
+            # 已存在的表不会由create_all补建新增列
+            self._add_missing_columns()
+            
+            # 已存在的表不会由create_all补建新增索引
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(bind=self.engine, checkfirst=True)
+            
             logger.info(f"✅ 数据库初始化成功: {DATABASE_CONFIG['url']}")
             
         except Exception as e:
             logger.error(f"❌ 数据库初始化失败: {e}")
             raise
     
+    def _add_missing_columns(self):
+        """为已存在的表补建模型中新增的可空列（ALTER TABLE ... ADD COLUMN，可重复执行）"""
+        inspector = inspect(self.engine)
+        existing_tables = set(inspector.get_table_names())
+        dialect = self.engine.dialect
+        
+        with self.engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                if table.name not in existing_tables:
+                    continue
+                existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in existing_columns:
+                        continue
+                    if not column.nullable:
+                        logger.warning(f"⚠️ 表 {table.name} 缺少非空列 {column.name}，需要手动迁移")
+                        continue
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect)}"
+                    ))
+                    logger.info(f"🔧 已为表 {table.name} 补建列 {column.name}")
+    
     def get_session(self) -> Session:
         """获取数据库会话"""
         return self.SessionLocal()
@@ -2,17 +2,31 @@
 数据库模型定义
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, Text, JSON, ForeignKey, Index, Select, Update, cast, select, update
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from datetime import datetime
-from typing import Dict, Any
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 
 Base = declarative_base()
 
+def isoformat_utc(value: Optional[datetime]) -> Optional[str]:
+    """数据库中的时间为UTC（无时区信息），序列化时统一带上+00:00偏移"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
 class Proposal(Base):
     """提案模型"""
     __tablename__ = 'proposals'
+    __table_args__ = (
+        # 待处理提案查询：status过滤 + created_at排序
+        Index('ix_proposals_status_created_at', 'status', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True, autoincrement=True)
     
@@ -41,14 +55,24 @@ class Proposal(Base):
     contract_proposal_id = Column(Integer, nullable=True, comment='合约中的提案ID')
     contract_address = Column(String(42), nullable=True, comment='MultiSig合约地址')
     
+    # 关联的检测日志（完整检测数据只保存在检测日志中）
+    detection_log_id = Column(Integer, ForeignKey('threat_detection_logs.id'), nullable=True, comment='关联的检测日志ID')
+    detection_log = relationship('ThreatDetectionLog', foreign_keys=[detection_log_id])
+    
     # 时间戳
     created_at = Column(DateTime, default=func.now(), comment='创建时间')
     approved_at = Column(DateTime, comment='批准时间')
     executed_at = Column(DateTime, comment='执行时间')
     
-    # 扩展数据
+    # 扩展数据（旧记录保留的完整检测数据，新记录通过detection_log引用）
     detection_data = Column(JSON, comment='完整检测数据')
     
+    def get_detection_data(self) -> Any:
+        """获取检测数据（优先使用本表旧数据，否则读取关联的检测日志）"""
+        if self.detection_data is not None:
+            return self.detection_data
+        return self.detection_log.detection_data if self.detection_log else None
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
@@ -68,11 +92,55 @@ class Proposal(Base):
             'reward_tx_hash': self.reward_tx_hash,
             'contract_proposal_id': self.contract_proposal_id,
             'contract_address': self.contract_address,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'approved_at': self.approved_at.isoformat() if self.approved_at else None,
-            'executed_at': self.executed_at.isoformat() if self.executed_at else None,
-            'detection_data': self.detection_data
+            'detection_log_id': self.detection_log_id,
+            'created_at': isoformat_utc(self.created_at),
+            'approved_at': isoformat_utc(self.approved_at),
+            'executed_at': isoformat_utc(self.executed_at),
+            'detection_data': self.get_detection_data()
         }
+    
+    @classmethod
+    def append_signer_stmt(cls, dialect_name: str, proposal_id: int, manager_role: str) -> Update:
+        """原子地追加签名者并递增签名数的UPDATE，RETURNING新的签名数；已签名时不更新任何行
+        
+        signed_by 是JSON列，按方言使用JSON函数在一条UPDATE中完成查重与追加
+        """
+        if dialect_name == "postgresql":
+            current = func.coalesce(cast(cls.signed_by, JSONB), cast("[]", JSONB))
+            new_signed_by = cast(current.op("||")(func.jsonb_build_array(manager_role)), JSON)
+            not_signed = ~current.has_key(manager_role)
+        else:
+            current = func.coalesce(cls.signed_by, "[]")
+            new_signed_by = func.json_insert(current, "$[#]", manager_role)
+            signers = func.json_each(current).table_valued("value")
+            not_signed = ~select(1).select_from(signers).where(signers.c.value == manager_role).exists()
+        
+        return (
+            update(cls)
+            .where(cls.id == proposal_id, not_signed)
+            .values(signed_by=new_signed_by,
+                    signatures_count=func.coalesce(cls.signatures_count, 0) + 1)
+            .returning(cls.signatures_count)
+            .execution_options(synchronize_session="fetch")
+        )
+    
+    @classmethod
+    def list_select(cls) -> Select:
+        """列表查询：直接选取所有列并关联检测数据，不实例化ORM对象"""
+        return select(
+            *cls.__table__.columns,
+            ThreatDetectionLog.detection_data.label('linked_detection_data')
+        ).outerjoin(ThreatDetectionLog, cls.detection_log_id == ThreatDetectionLog.id)
+    
+    @classmethod
+    def row_to_dict(cls, row) -> Dict[str, Any]:
+        """将list_select()的结果行转换为与to_dict()一致的字典"""
+        data = {name: row[name] for name in cls.__table__.columns.keys()}
+        for field in ('created_at', 'approved_at', 'executed_at'):
+            data[field] = isoformat_utc(data[field])
+        if data['detection_data'] is None:
+            data['detection_data'] = row['linked_detection_data']
+        return data
 
 class ExecutionLog(Base):
     """执行日志模型"""
@@ -82,6 +150,8 @@ class ExecutionLog(Base):
     
     # 关联信息
     proposal_id = Column(Integer, comment='关联的提案ID')
+    detection_log_id = Column(Integer, ForeignKey('threat_detection_logs.id'), nullable=True, comment='关联的检测日志ID')
+    detection_log = relationship('ThreatDetectionLog', foreign_keys=[detection_log_id])
     
     # 执行信息
     action_type = Column(String(50), nullable=False, comment='执行动作：block/unblock/auto_block')
@@ -100,14 +170,21 @@ class ExecutionLog(Base):
     # 时间戳
     executed_at = Column(DateTime, default=func.now(), comment='执行时间')
     
-    # 扩展数据
+    # 扩展数据（旧记录保留的完整执行数据，新记录通过detection_log引用）
     execution_data = Column(JSON, comment='完整执行数据')
     
+    def get_execution_data(self) -> Any:
+        """获取执行数据（优先使用本表旧数据，否则读取关联的检测日志）"""
+        if self.execution_data is not None:
+            return self.execution_data
+        return self.detection_log.detection_data if self.detection_log else None
+    
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
             'id': self.id,
             'proposal_id': self.proposal_id,
+            'detection_log_id': self.detection_log_id,
             'action_type': self.action_type,
             'target_ip': self.target_ip,
             'threat_type': self.threat_type,
@@ -116,9 +193,26 @@ class ExecutionLog(Base):
             'execution_details': self.execution_details,
             'manager_account': self.manager_account,
             'reward_tx_hash': self.reward_tx_hash,
-            'executed_at': self.executed_at.isoformat() if self.executed_at else None,
-            'execution_data': self.execution_data
+            'executed_at': isoformat_utc(self.executed_at),
+            'execution_data': self.get_execution_data()
         }
+    
+    @classmethod
+    def list_select(cls) -> Select:
+        """列表查询：直接选取所有列并关联检测数据，不实例化ORM对象"""
+        return select(
+            *cls.__table__.columns,
+            ThreatDetectionLog.detection_data.label('linked_detection_data')
+        ).outerjoin(ThreatDetectionLog, cls.detection_log_id == ThreatDetectionLog.id)
+    
+    @classmethod
+    def row_to_dict(cls, row) -> Dict[str, Any]:
+        """将list_select()的结果行转换为与to_dict()一致的字典"""
+        data = {name: row[name] for name in cls.__table__.columns.keys()}
+        data['executed_at'] = isoformat_utc(data['executed_at'])
+        if data['execution_data'] is None:
+            data['execution_data'] = row['linked_detection_data']
+        return data
 
 class ThreatDetectionLog(Base):
     """威胁检测日志模型"""
@@ -160,9 +254,16 @@ class ThreatDetectionLog(Base):
             'action_taken': self.action_taken,
             'proposal_id': self.proposal_id,
             'execution_log_id': self.execution_log_id,
-            'detected_at': self.detected_at.isoformat() if self.detected_at else None,
+            'detected_at': isoformat_utc(self.detected_at),
             'detection_data': self.detection_data
         }
+    
+    @classmethod
+    def row_to_dict(cls, row) -> Dict[str, Any]:
+        """将select(*__table__.columns)的结果行转换为与to_dict()一致的字典"""
+        data = dict(row)
+        data['detected_at'] = isoformat_utc(data['detected_at'])
+        return data
 
 class RewardPool(Base):
     """奖金池模型"""
@@ -203,8 +304,8 @@ class RewardPool(Base):
             'total_deposits': self.total_deposits,
             'total_rewards': self.total_rewards,
             'active_managers': self.active_managers,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': isoformat_utc(self.created_at),
+            'updated_at': isoformat_utc(self.updated_at),
             'pool_config': self.pool_config
         }
 
@@ -263,8 +364,8 @@ class RewardPoolTransaction(Base):
             'pool_id': self.pool_id,
             'status': self.status,
             'error_message': self.error_message,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'confirmed_at': self.confirmed_at.isoformat() if self.confirmed_at else None,
+            'created_at': isoformat_utc(self.created_at),
+            'confirmed_at': isoformat_utc(self.confirmed_at),
             'transaction_data': self.transaction_data
         }
 
@@ -317,11 +418,11 @@ class ContributionRecord(Base):
             'total_rewards_earned': self.total_rewards_earned,
             'last_reward_amount': self.last_reward_amount,
             'reward_count': self.reward_count,
-            'last_signature_time': self.last_signature_time.isoformat() if self.last_signature_time else None,
-            'last_reward_time': self.last_reward_time.isoformat() if self.last_reward_time else None,
-            'active_since': self.active_since.isoformat() if self.active_since else None,
+            'last_signature_time': isoformat_utc(self.last_signature_time),
+            'last_reward_time': isoformat_utc(self.last_reward_time),
+            'active_since': isoformat_utc(self.active_since),
             'performance_grade': self.performance_grade,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'created_at': isoformat_utc(self.created_at),
+            'updated_at': isoformat_utc(self.updated_at),
             'contribution_data': self.contribution_data
         }
\ No newline at end of file
@@ -7,11 +7,12 @@ from typing import Optional
 from fastapi import FastAPI, Depends, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
 from backend.database.connection import init_database, get_db
-from backend.blockchain.web3_manager import init_web3_manager
+from backend.blockchain.web3_manager import init_web3_manager, get_web3_manager
 from backend.ai_module.model_loader import init_threat_model
 from backend.app.services import ThreatDetectionService, ProposalService, SystemInfoService, RewardPoolService
 
@@ -77,6 +78,11 @@ async def lifespan(app: FastAPI):
     
     # 关闭时清理
     logger.info("🛑 关闭系统...")
+    threat_service.flush_deferred_detections()
+    web3_manager = get_web3_manager()
+    if web3_manager.multisig_contract:
+        web3_manager.multisig_contract.flush_state(force=True)
+    web3_manager.shutdown()
 
 app = FastAPI(
     title="区块链智能安防平台",
@@ -139,9 +145,10 @@ async def simulate_attack(db: Session = Depends(get_db)):
     
     执行AI威胁检测模拟，自动生成攻击场景并进行分析，
     根据置信度自动决定响应策略（自动响应、创建提案或人工决策）。
+    低置信度静默记录的检测日志延迟批量写入，返回的detection_id为None。
     """
     try:
-        result = threat_service.simulate_attack(db)
+        result = await threat_service.simulate_attack(db)
         return success_response(
             data=result,
             message="攻击模拟执行成功"
@@ -150,6 +157,26 @@ async def simulate_attack(db: Session = Depends(get_db)):
         logger.error(f"攻击模拟失败: {e}")
         raise SystemException(f"攻击模拟执行失败: {str(e)}")
 
+@app.post("/api/v1/attack/simulate/batch", response_model=dict, tags=["威胁检测"])
+async def simulate_attack_batch(
+    count: int = Query(10, description="模拟次数", ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """批量模拟攻击检测
+    
+    连续执行多次AI威胁检测模拟，检测日志、执行日志和提案
+    分别以一次批量写入入库，用于演示和压测场景。
+    """
+    try:
+        result = await threat_service.simulate_attack_batch(db, count)
+        return success_response(
+            data=result,
+            message="批量攻击模拟执行成功"
+        )
+    except Exception as e:
+        logger.error(f"批量攻击模拟失败: {e}")
+        raise SystemException(f"批量攻击模拟执行失败: {str(e)}")
+
 # ================== 系统状态相关API ==================
 
 @app.get("/api/v1/system/status", response_model=dict, tags=["系统状态"])
@@ -163,7 +190,7 @@ async def get_system_status(db: Session = Depends(get_db)):
     - 数据库统计信息
     """
     try:
-        status = system_service.get_system_status(db)
+        status = await system_service.get_system_status(db)
         return success_response(
             data=status,
             message="系统状态获取成功"
@@ -281,12 +308,15 @@ async def get_detection_logs(
     try:
         from backend.database.models import ThreatDetectionLog
         
-        logs = db.query(ThreatDetectionLog).order_by(
-            ThreatDetectionLog.detected_at.desc()
-        ).limit(limit).all()
+        # 直接选取列构造字典，跳过ORM对象实例化
+        rows = db.execute(
+            select(*ThreatDetectionLog.__table__.columns)
+            .order_by(ThreatDetectionLog.detected_at.desc())
+            .limit(limit)
+        ).mappings()
         
         return success_response(
-            data=[log.to_dict() for log in logs],
+            data=[ThreatDetectionLog.row_to_dict(row) for row in rows],
             message="检测日志获取成功"
         )
     except Exception as e:
@@ -307,12 +337,15 @@ async def get_execution_logs(
     try:
         from backend.database.models import ExecutionLog
         
-        logs = db.query(ExecutionLog).order_by(
-            ExecutionLog.executed_at.desc()
-        ).limit(limit).all()
+        # 单条JOIN查询关联检测数据并直接构造字典，避免逐条懒加载和ORM对象实例化
+        rows = db.execute(
+            ExecutionLog.list_select()
+            .order_by(ExecutionLog.executed_at.desc())
+            .limit(limit)
+        ).mappings()
         
         return success_response(
-            data=[log.to_dict() for log in logs],
+            data=[ExecutionLog.row_to_dict(row) for row in rows],
             message="执行日志获取成功"
         )
     except Exception as e:
@@ -343,27 +376,19 @@ async def fund_account(request: FundAccountRequest):
         
         # 执行转账
         treasury_account = treasury_info['address']
-        treasury_private_key = web3_manager.accounts['treasury']['private_key']
+        value = web3_manager.w3.to_wei(request.amount, 'ether')
         
-        # 构建交易
-        nonce = web3_manager.w3.eth.get_transaction_count(treasury_account)
-        transaction = {
+        # 构建交易，使用Treasury本地预留的nonce签名并发送
+        tx_hash = web3_manager.send_signed_transaction('treasury', lambda nonce: {
             'nonce': nonce,
             'to': request.to_address,
-            'value': web3_manager.w3.to_wei(request.amount, 'ether'),
+            'value': value,
             'gas': 21000,
             'gasPrice': web3_manager.w3.to_wei('1', 'gwei')
-        }
-        
-        # 签名并发送交易
-        signed_txn = web3_manager.w3.eth.account.sign_transaction(
-            transaction, 
-            private_key=treasury_private_key
-        )
-        tx_hash = web3_manager.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
+        })
         
         # 等待交易确认
-        receipt = web3_manager.w3.eth.wait_for_transaction_receipt(tx_hash)
+        receipt = web3_manager.wait_for_receipt(tx_hash)
         
         # 获取新余额
         new_balance = web3_manager.w3.eth.get_balance(request.to_address)
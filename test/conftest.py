@@ -0,0 +1,42 @@
+"""
+pytest公共夹具：内存SQLite数据库
+"""
+
+import sys
+from pathlib import Path
+
+import orjson
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# 添加项目根路径（以backend包的形式导入）
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.database import connection
+from backend.database.connection import DatabaseManager, json_dumps
+from backend.database.models import Base
+
+
+@pytest.fixture
+def db_manager(monkeypatch):
+    """替换全局数据库管理器为内存SQLite
+
+    StaticPool让所有线程共用同一个连接，工作线程（asyncio.to_thread、刷新定时器）
+    看到的是同一个内存数据库
+    """
+    manager = DatabaseManager.__new__(DatabaseManager)
+    manager.engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+        json_serializer=json_dumps,
+        json_deserializer=orjson.loads
+    )
+    manager.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=manager.engine)
+    Base.metadata.create_all(bind=manager.engine)
+
+    monkeypatch.setattr(connection, "db_manager", manager)
+    yield manager
+    manager.engine.dispose()
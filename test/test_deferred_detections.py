@@ -0,0 +1,86 @@
+"""
+测试静默记录检测日志的延迟批量写入（写入失败时放回缓冲区重试）
+"""
+
+import pytest
+from sqlalchemy import select
+
+from backend.app import services
+from backend.app.services import SILENT_LOGGING_ACTION, ThreatDetectionService
+from backend.config import DATABASE_CONFIG
+from backend.database.models import ThreatDetectionLog
+
+
+def _detection(label: str) -> dict:
+    return {
+        "predicted_class": label,
+        "confidence": 0.5,
+        "true_label": label,
+        "response_level": "silent_logging",
+    }
+
+
+def _stored_labels(db_manager) -> list:
+    with db_manager.session_scope() as db:
+        return db.scalars(select(ThreatDetectionLog.true_label).order_by(ThreatDetectionLog.id)).all()
+
+
+@pytest.fixture
+def service(db_manager, monkeypatch):
+    # 不加载AI模型、不连接区块链；刷新间隔调大，由测试显式调用flush
+    monkeypatch.setattr(services, "get_threat_model", lambda: None)
+    monkeypatch.setattr(services, "get_web3_manager", lambda: None)
+    monkeypatch.setitem(DATABASE_CONFIG, "deferred_log_flush_interval", 60)
+    service = ThreatDetectionService()
+    yield service
+    if service._deferred_flush_timer is not None:
+        service._deferred_flush_timer.cancel()
+
+
+def test_buffered_detection_has_no_id_until_flush(service, db_manager):
+    result = service._buffer_detection(_detection("Bot"), "10.0.0.1", "10.0.0.2", SILENT_LOGGING_ACTION)
+
+    assert result.detection_id is None
+    assert result.response_action["action_taken"] == "silent_logging"
+    assert service._deferred_flush_timer is not None
+    assert _stored_labels(db_manager) == []
+
+    assert service.flush_deferred_detections() == 1
+    assert _stored_labels(db_manager) == ["Bot"]
+    assert service._deferred_flush_timer is None
+
+
+def test_failed_flush_requeues_rows_in_order(service, db_manager):
+    for label in ("Bot", "PortScan", "DDoS"):
+        service._buffer_detection(_detection(label), "10.0.0.1", "10.0.0.2", SILENT_LOGGING_ACTION)
+
+    def fail(db, rows):
+        raise RuntimeError("database is locked")
+
+    service._insert_detection_logs = fail
+    assert service.flush_deferred_detections() == 0
+
+    # 记录按原顺序放回缓冲区，并重新安排了重试定时器
+    assert [row["true_label"] for row in service._deferred_detections] == ["Bot", "PortScan", "DDoS"]
+    assert service._deferred_flush_timer is not None
+    assert _stored_labels(db_manager) == []
+
+    # 失败期间新缓冲的记录排在重试记录之后
+    service._buffer_detection(_detection("SSH-Patator"), "10.0.0.1", "10.0.0.2", SILENT_LOGGING_ACTION)
+
+    del service._insert_detection_logs
+    assert service.flush_deferred_detections() == 4
+    assert _stored_labels(db_manager) == ["Bot", "PortScan", "DDoS", "SSH-Patator"]
+    assert not service._deferred_detections
+
+
+def test_full_buffer_flushes_synchronously(service, db_manager, monkeypatch):
+    monkeypatch.setitem(DATABASE_CONFIG, "deferred_log_buffer_size", 3)
+
+    for label in ("Bot", "PortScan"):
+        service._buffer_detection(_detection(label), "10.0.0.1", "10.0.0.2", SILENT_LOGGING_ACTION)
+    assert _stored_labels(db_manager) == []
+
+    service._buffer_detection(_detection("DDoS"), "10.0.0.1", "10.0.0.2", SILENT_LOGGING_ACTION)
+    assert _stored_labels(db_manager) == ["Bot", "PortScan", "DDoS"]
+    assert not service._deferred_detections
@@ -0,0 +1,113 @@
+"""
+测试合约事件监听器的区块游标与日志去重
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from backend.blockchain.contract_event_listener import ContractEventListener
+from backend.database.models import Proposal
+
+TOPIC = b"\x01" * 32
+
+
+def _log(block_number: int, log_index: int = 0) -> dict:
+    return {
+        "transactionHash": bytes([block_number]) * 32,
+        "logIndex": log_index,
+        "blockNumber": block_number,
+        "topics": [TOPIC],
+    }
+
+
+class FakeEth:
+    """按区块区间返回预置日志的节点"""
+
+    def __init__(self, logs):
+        self.logs = logs
+        self.requests = []
+
+    def get_logs(self, params):
+        self.requests.append((params["fromBlock"], params["toBlock"]))
+        return [log for log in self.logs
+                if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+
+class Recorder:
+    """事件处理函数：为每条日志插入一个提案，failing中的区块同步时抛出异常"""
+
+    def __init__(self):
+        self.failing = set()
+
+    def __call__(self, log):
+        def operation(db):
+            if log["blockNumber"] in self.failing:
+                raise RuntimeError(f"区块 {log['blockNumber']} 同步失败")
+            db.add(Proposal(threat_type=f"block-{log['blockNumber']}-{log['logIndex']}",
+                            confidence=0.9, proposal_type="auto"))
+        return operation
+
+
+@pytest.fixture
+def listener(db_manager):
+    eth = FakeEth([_log(1), _log(2), _log(2, 1), _log(3), _log(5)])
+    manager = SimpleNamespace(w3=SimpleNamespace(eth=eth), contract=SimpleNamespace(address="0xcontract"))
+    listener = ContractEventListener(manager)
+    listener.log_filter_params = {"address": "0xcontract", "topics": [[TOPIC]]}
+    listener.recorder = Recorder()
+    listener.event_handlers = {TOPIC: (SimpleNamespace(process_log=lambda log: log), listener.recorder)}
+    listener._next_block = 1
+    return listener
+
+
+def _synced(db_manager) -> list:
+    with db_manager.session_scope() as db:
+        return db.scalars(select(Proposal.threat_type).order_by(Proposal.id)).all()
+
+
+def test_cursor_advances_past_synced_blocks(listener, db_manager):
+    assert asyncio.run(listener._check_new_events(5)) is True
+
+    assert listener._next_block == 6
+    assert _synced(db_manager) == ["block-1-0", "block-2-0", "block-2-1", "block-3-0", "block-5-0"]
+
+
+def test_cursor_holds_at_first_failed_block(listener, db_manager):
+    listener._stride = 10
+    listener.recorder.failing = {3}
+
+    assert asyncio.run(listener._check_new_events(5)) is False
+
+    # 同一区间内其他日志逐条重试后已提交，游标停在失败日志所在区块
+    assert listener._next_block == 3
+    assert _synced(db_manager) == ["block-1-0", "block-2-0", "block-2-1", "block-5-0"]
+
+    # 重新拉取时已提交的日志按去重跳过，只补上失败的日志
+    listener.recorder.failing = set()
+    assert asyncio.run(listener._check_new_events(5)) is True
+    assert listener._next_block == 6
+    assert _synced(db_manager) == ["block-1-0", "block-2-0", "block-2-1", "block-5-0", "block-3-0"]
+
+
+def test_replayed_logs_are_skipped(listener, db_manager):
+    assert asyncio.run(listener._check_new_events(5)) is True
+
+    # 节点重放（或补拉与订阅推送重叠）同一批日志
+    listener._next_block = 1
+    assert asyncio.run(listener._check_new_events(5)) is True
+    assert len(_synced(db_manager)) == 5
+
+
+def test_failed_log_is_not_marked_seen(listener, db_manager):
+    listener.recorder.failing = {2}
+    failed_block = asyncio.run(listener._apply_operations([listener._dispatch_log(_log(2))]))
+
+    assert failed_block == 2
+    assert listener._dispatch_log(_log(2)) is not None
+
+    listener.recorder.failing = set()
+    assert asyncio.run(listener._apply_operations([listener._dispatch_log(_log(2))])) is None
+    assert listener._dispatch_log(_log(2)) is None
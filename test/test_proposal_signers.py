@@ -0,0 +1,77 @@
+"""
+测试提案签名者的原子追加（Proposal.append_signer_stmt）
+"""
+
+from sqlalchemy import select
+
+from backend.database.models import Proposal
+
+
+def _create_proposal(db_manager) -> int:
+    with db_manager.session_scope() as db:
+        proposal = Proposal(threat_type="DDoS", confidence=0.85, proposal_type="auto",
+                            signatures_required=2)
+        db.add(proposal)
+        db.flush()
+        return proposal.id
+
+
+def _append_signer(db_manager, proposal_id: int, manager_role: str):
+    with db_manager.session_scope() as db:
+        stmt = Proposal.append_signer_stmt(db.get_bind().dialect.name, proposal_id, manager_role)
+        return db.execute(stmt).scalar()
+
+
+def _signers(db_manager, proposal_id: int):
+    with db_manager.session_scope() as db:
+        return db.execute(
+            select(Proposal.signed_by, Proposal.signatures_count).where(Proposal.id == proposal_id)
+        ).one()
+
+
+def test_append_signer_returns_new_count(db_manager):
+    proposal_id = _create_proposal(db_manager)
+
+    assert _append_signer(db_manager, proposal_id, "manager_0") == 1
+    assert _append_signer(db_manager, proposal_id, "manager_1") == 2
+
+    signed_by, signatures_count = _signers(db_manager, proposal_id)
+    assert signed_by == ["manager_0", "manager_1"]
+    assert signatures_count == 2
+
+
+def test_append_signer_rejects_duplicate(db_manager):
+    proposal_id = _create_proposal(db_manager)
+
+    assert _append_signer(db_manager, proposal_id, "manager_0") == 1
+    assert _append_signer(db_manager, proposal_id, "manager_0") is None
+
+    signed_by, signatures_count = _signers(db_manager, proposal_id)
+    assert signed_by == ["manager_0"]
+    assert signatures_count == 1
+
+
+def test_append_signer_keeps_concurrent_signature(db_manager):
+    """另一个会话已读取旧的签名列表，追加时仍以数据库中的当前值为准（不丢失更新）"""
+    proposal_id = _create_proposal(db_manager)
+
+    stale_session = db_manager.get_session()
+    try:
+        stale = stale_session.get(Proposal, proposal_id)
+        assert stale.signed_by == []
+
+        assert _append_signer(db_manager, proposal_id, "manager_0") == 1
+
+        stmt = Proposal.append_signer_stmt("sqlite", proposal_id, "manager_1")
+        assert stale_session.execute(stmt).scalar() == 2
+        stale_session.commit()
+    finally:
+        stale_session.close()
+
+    signed_by, signatures_count = _signers(db_manager, proposal_id)
+    assert signed_by == ["manager_0", "manager_1"]
+    assert signatures_count == 2
+
+
+def test_append_signer_unknown_proposal(db_manager):
+    assert _append_signer(db_manager, 999, "manager_0") is None
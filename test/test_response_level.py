@@ -0,0 +1,46 @@
+"""
+测试置信度到响应级别的映射（阈值阶梯的边界值）
+"""
+
+import pytest
+
+from backend.ai_module.model_loader import ThreatDetectionModel
+from backend.config import THREAT_THRESHOLDS
+
+
+def _reference_level(confidence: float) -> str:
+    """逐级比较的参考实现：置信度严格大于阈值才进入更高级别"""
+    if confidence > THREAT_THRESHOLDS['high_confidence']:
+        return "automatic_response"
+    elif confidence > THREAT_THRESHOLDS['medium_high']:
+        return "auto_create_proposal"
+    elif confidence > THREAT_THRESHOLDS['medium_low']:
+        return "manual_decision_alert"
+    else:
+        return "silent_logging"
+
+
+@pytest.fixture
+def model():
+    # 只测试响应级别映射，不加载模型文件
+    return ThreatDetectionModel.__new__(ThreatDetectionModel)
+
+
+@pytest.mark.parametrize("confidence, expected", [
+    (0.0, "silent_logging"),
+    (0.70, "silent_logging"),
+    (0.7000001, "manual_decision_alert"),
+    (0.80, "manual_decision_alert"),
+    (0.8000001, "auto_create_proposal"),
+    (0.90, "auto_create_proposal"),
+    (0.9000001, "automatic_response"),
+    (1.0, "automatic_response"),
+])
+def test_response_level_boundaries(model, confidence, expected):
+    assert model._determine_response_level(confidence) == expected
+
+
+def test_response_level_matches_reference(model):
+    for i in range(0, 10001):
+        confidence = i / 10000
+        assert model._determine_response_level(confidence) == _reference_level(confidence)